@@ -1,7 +1,29 @@
 from django.contrib import admin
+from django.utils.text import Truncator
 
 # настройка админ-зоны для импортируемых моделей
+from blog.export import FORMAT_CSV, FORMAT_JSONL, export_response
 from blog.models import Category, Location, Post, Comments
+from blog.paginators import CountCachingPaginator
+from blog.search import build_match_query, fts_available, matching_post_ids
+
+# Сколько символов текста показывать в списках постов и комментариев.
+TEXT_PREVIEW_LENGTH = 80
+
+
+@admin.display(description='Текст')
+def text_preview(obj):
+    return Truncator(obj.text).chars(TEXT_PREVIEW_LENGTH)
+
+
+@admin.action(description='Выгрузить выбранное в CSV')
+def export_csv(modeladmin, request, queryset):
+    return export_response(queryset, FORMAT_CSV)
+
+
+@admin.action(description='Выгрузить выбранное в JSON Lines')
+def export_jsonl(modeladmin, request, queryset):
+    return export_response(queryset, FORMAT_JSONL)
 
 
 @admin.register(Category)
@@ -33,24 +55,47 @@ class PostAdmin(admin.ModelAdmin):
     """Класс для настройки админ-зоны модели Post"""
     list_display = (
         'title',
-        'text',
+        text_preview,
         'pub_date',
         'author',
         'location',
         'category',
         'is_published',
+        'comment_count',
         'created_at'
     )
+    list_select_related = ('author', 'location', 'category')
+    list_filter = ('is_published', 'category')
+    date_hierarchy = 'pub_date'
     search_fields = ('title',)
+    autocomplete_fields = ('author', 'location', 'category')
+    # без полного COUNT(*) по таблице; число строк под фильтром кешируется.
+    show_full_result_count = False
+    paginator = CountCachingPaginator
+    actions = (export_csv, export_jsonl)
+
+    def get_search_results(self, request, queryset, search_term):
+        # ищем по полнотекстовому индексу вместо LIKE '%...%'.
+        if not fts_available() or not build_match_query(search_term):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=matching_post_ids(search_term)), False
 
 
 @admin.register(Comments)
 class CommentsAdmin(admin.ModelAdmin):
-    """Класс для настройки админ-зоны модели Post"""
+    """Класс для настройки админ-зоны модели Comments"""
     list_display = (
-        'text',
+        text_preview,
         'post',
         'author',
         'created_at',
     )
+    list_select_related = ('post', 'author')
+    date_hierarchy = 'created_at'
     search_fields = ('text',)
+    autocomplete_fields = ('post', 'author')
+    show_full_result_count = False
+    paginator = CountCachingPaginator
+    actions = (export_csv, export_jsonl)
@@ -6,3 +6,7 @@ class BlogConfig(AppConfig):
     name = 'blog'
     # переводим приложение "Blog" на русский: "Блог".
     verbose_name = 'Блог'
+
+    def ready(self):
+        # подключаем обработчики сигналов приложения.
+        from blog import signals  # noqa: F401
@@ -0,0 +1,158 @@
+import math
+import platform
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Comments, Post
+
+User = get_user_model()
+
+# Перцентили задержки, которые попадают в отчёт.
+PERCENTILES = (50, 90, 95, 99)
+
+# Допустимый рост p95 относительно базовой линии и абсолютный запас в мс,
+# чтобы шум на быстрых страницах не считался регрессией.
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_SLACK_MS = 5.0
+
+# Свой кеш замера: очистка между повторами не трогает общий кеш проекта.
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+def benchmark_settings():
+    """Настройки замера: свой кеш и middleware без мониторинга.
+
+    Мониторинг делает свои запросы к базе (например, EXPLAIN медленных
+    запросов), и их число скакало бы между прогонами.
+    """
+    return override_settings(
+        CACHES=BENCHMARK_CACHES,
+        MIDDLEWARE=[
+            middleware for middleware in settings.MIDDLEWARE
+            if not middleware.startswith('monitoring.')
+        ],
+    )
+
+
+def benchmark_urls():
+    """Страницы для замера: лента, пост, категория и профиль."""
+    visible = Post.objects.published().filter(category__is_published=True)
+    top_author = User.objects.annotate(
+        total=Count('posts'),
+    ).order_by('-total', 'pk').first()
+    post = visible.order_by('-comment_count', 'pk').first()
+    category = Category.objects.filter(is_published=True).first()
+    pages = max(math.ceil(visible.count() / 10), 1)
+    return {
+        'index': reverse('blog:index'),
+        'index_deep_page': f"{reverse('blog:index')}?page={pages // 2 or 1}",
+        'post_detail': reverse('blog:post_detail', args=[post.pk]),
+        'category_posts': reverse(
+            'blog:category_posts', args=[category.slug]),
+        'profile': reverse('blog:profile', args=[top_author.username]),
+    }
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(client, url, repeat, warm=False):
+    """Время ответа url в мс и число запросов к базе за repeat повторов.
+
+    Без warm кеш очищается перед каждым запросом: замеряется путь через
+    базу, который и растёт вместе с таблицами.
+    """
+    client.get(url)
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} ответил {response.status_code}')
+        queries = max(queries, len(ctx.captured_queries))
+    result = {'url': url, 'queries': queries}
+    result.update({
+        f'p{percent}_ms': round(percentile(timings, percent), 3)
+        for percent in PERCENTILES
+    })
+    result['mean_ms'] = round(sum(timings) / len(timings), 3)
+    return result
+
+
+def run_benchmark(repeat=20, warm=False):
+    """Замеряет страницы блога от имени залогиненного пользователя.
+
+    Залогиненным страничный кеш не отдаётся, поэтому рендер идёт каждый
+    раз. Замер идёт с настройками benchmark_settings().
+    """
+    with benchmark_settings():
+        client = Client()
+        client.force_login(User.objects.order_by('pk').first())
+        results = {
+            name: measure(client, url, repeat, warm)
+            for name, url in benchmark_urls().items()
+        }
+    return {
+        'meta': {
+            'posts': Post.objects.count(),
+            'comments': Comments.objects.count(),
+            'users': User.objects.count(),
+            'repeat': repeat,
+            'warm': warm,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'created_at': timezone.now().isoformat(),
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE,
+            slack_ms=DEFAULT_SLACK_MS):
+    """Список регрессий отчёта относительно базовой линии.
+
+    Число запросов не должно расти вовсе, p95 — не больше чем на
+    tolerance плюс slack_ms.
+    """
+    regressions = []
+    for name, expected in baseline['results'].items():
+        actual = report['results'].get(name)
+        if actual is None:
+            continue
+        if actual['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: запросов {actual["queries"]} '
+                f'вместо {expected["queries"]}'
+            )
+        limit = expected['p95_ms'] * (1 + tolerance) + slack_ms
+        if actual['p95_ms'] > limit:
+            regressions.append(
+                f'{name}: p95 {actual["p95_ms"]:.1f} мс '
+                f'при базовом {expected["p95_ms"]:.1f} мс'
+            )
+    return regressions
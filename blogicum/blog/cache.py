@@ -0,0 +1,192 @@
+import hashlib
+import uuid
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.utils import timezone
+
+from monitoring.metrics import record_cache_lookup
+
+FEED_GENERATION_KEY = 'blog:feed:generation'
+
+
+def feed_bucket_seconds():
+    """Длина временной корзины ленты в секундах (0 — без корзин)."""
+    return getattr(settings, 'BLOG_FEED_CACHE_BUCKET', 0)
+
+
+def feed_now(now=None):
+    """Текущее (или переданное) время, округлённое вниз до начала корзины.
+
+    Все запросы ленты внутри одной корзины получают одинаковый параметр
+    pub_date__lte, а значит, и одинаковый SQL, который можно кешировать.
+    """
+    now = now or timezone.now()
+    bucket = feed_bucket_seconds()
+    if not bucket:
+        return now
+    start = int(now.timestamp()) // bucket * bucket
+    return datetime.fromtimestamp(start, tz=timezone.utc)
+
+
+def feed_generation():
+    """Номер поколения ленты; меняется при любой правке контента."""
+    return cache.get_or_set(FEED_GENERATION_KEY, 1, None)
+
+
+def bump_feed_generation():
+    """Делает недействительными все закешированные выборки ленты."""
+    try:
+        cache.incr(FEED_GENERATION_KEY)
+    except ValueError:
+        cache.set(FEED_GENERATION_KEY, 1, None)
+
+
+def queryset_cache_key(prefix, queryset):
+    """Ключ кеша по SQL запроса, его параметрам и поколению ленты.
+
+    Для заведомо пустого запроса возвращает None.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    digest = hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    return f'blog:{prefix}:{feed_generation()}:{digest}'
+
+
+def cached_rows(queryset, fresh_fields=()):
+    """Вычисляет queryset, разделяя результат между одинаковыми запросами.
+
+    Время жизни записи равно длине корзины, поэтому она не переживает
+    свою корзину. Поля fresh_fields, которые меняются без сброса кеша
+    выборок, у взятых из кеша строк перечитываются одним запросом по pk.
+    """
+    bucket = feed_bucket_seconds()
+    if not bucket:
+        return list(queryset)
+    key = queryset_cache_key('feed', queryset)
+    if key is None:
+        return []
+    rows = cache.get(key)
+    record_cache_lookup('rows', rows is not None)
+    if rows is None:
+        rows = list(queryset)
+        cache.set(key, rows, bucket)
+    elif fresh_fields and rows:
+        fresh = {
+            values[0]: values[1:]
+            for values in queryset.model._default_manager.filter(
+                pk__in=[row.pk for row in rows],
+            ).order_by().values_list('pk', *fresh_fields)
+        }
+        for row in rows:
+            for field, value in zip(fresh_fields, fresh.get(row.pk, ())):
+                setattr(row, field, value)
+    return rows
+
+
+def _page_tag_key(tag):
+    return f'blog:page:tag:{tag}'
+
+
+def _new_tag_stamp():
+    return uuid.uuid4().hex, timezone.now()
+
+
+def page_tag_stamps(tags):
+    """Текущие версии тегов страничного кеша и время их последнего сброса.
+
+    Отсутствующим (новым или вытесненным) тегам назначается свежая версия
+    с текущим временем, поэтому вытеснение тега никогда не возвращает
+    устаревшую страницу или отметку Last-Modified.
+    """
+    keys = {_page_tag_key(tag): tag for tag in tags}
+    stamps = cache.get_many(keys)
+    missing = {key: _new_tag_stamp() for key in keys if key not in stamps}
+    if missing:
+        cache.set_many(missing, None)
+        stamps.update(missing)
+    return [stamps[key] for key in sorted(keys)]
+
+
+def page_tag_versions(tags):
+    """Текущие версии тегов страничного кеша."""
+    return [version for version, _ in page_tag_stamps(tags)]
+
+
+def bump_page_tags(tags):
+    """Сбрасывает все закешированные страницы с указанными тегами."""
+    if tags:
+        cache.set_many(
+            {_page_tag_key(tag): _new_tag_stamp() for tag in tags}, None
+        )
+
+
+def _page_posts_key(request):
+    digest = hashlib.md5(
+        f'{request.get_full_path()}|{request.user.pk}'.encode()
+    ).hexdigest()
+    return f'blog:page:posts:{digest}'
+
+
+def remember_page_posts(request, posts):
+    """Запоминает посты, показанные на странице списка.
+
+    По их тегам проверяются страничный кеш и ETag списка, поэтому
+    комментарий сбрасывает только тег своего поста, а не все ленты.
+    """
+    tags = [f'post:{post.pk}' for post in posts]
+    request.blog_page_post_tags = tags
+    cache.set(_page_posts_key(request), tags, None)
+
+
+def page_post_tags(request):
+    """Теги постов страницы с прошлого рендера или None, если их нет."""
+    return cache.get(_page_posts_key(request))
+
+
+def cache_anonymous_page(*tag_templates):
+    """Кеширует страницу целиком для анонимных пользователей.
+
+    Теги задаются шаблонами, которые заполняются аргументами URL,
+    например 'post:{id}'. Ключ страницы включает версии её тегов, так что
+    bump_page_tags сбрасывает только затронутые страницы. Страница списка
+    хранится вместе с версиями тегов показанных на ней постов (см.
+    remember_page_posts) и не отдаётся, если какой-то из них сброшен.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view_func(request, *args, **kwargs)
+            tags = [tag.format(**kwargs) for tag in tag_templates]
+            digest = hashlib.md5(
+                f'{request.get_full_path()}{page_tag_versions(tags)}'.encode()
+            ).hexdigest()
+            key = f'blog:page:{digest}'
+            entry = cache.get(key)
+            if entry is not None:
+                post_tags, versions, response = entry
+                if page_tag_versions(post_tags) != versions:
+                    entry = None
+            record_cache_lookup('page', entry is not None)
+            if entry is not None:
+                return response
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.cookies:
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                post_tags = getattr(request, 'blog_page_post_tags', [])
+                cache.set(
+                    key,
+                    (post_tags, page_tag_versions(post_tags), response),
+                    getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 60),
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,122 @@
+import hashlib
+
+from django.views.decorators.http import condition
+
+from blog.cache import (
+    cached_rows, feed_now, page_post_tags, page_tag_stamps,
+)
+from blog.models import Post
+
+
+def _list_validators(request, tags, latest):
+    """Валидаторы страницы списка с тегами показанных на ней постов.
+
+    Посты страницы известны только после первого рендера, до этого
+    валидаторов нет.
+    """
+    post_tags = page_post_tags(request)
+    if post_tags is None:
+        return None
+    return _validators(
+        request, (request.GET.urlencode(),), [*tags, *post_tags], latest,
+    )
+
+
+def _validators(request, parts, tags, latest=None):
+    """Собирает ETag и Last-Modified из тегов страничного кеша.
+
+    Теги сбрасываются сигналами при любой правке, которая видна на
+    странице (посты, комментарии, категории, локации, удаление), поэтому
+    для них не нужны запросы к базе. Пост с отложенной датой появляется в
+    ленте без сигнала, если планировщик не запущен, поэтому в валидаторы
+    лент входит и latest — дата самого нового видимого поста. В ETag
+    попадают также пользователь и его CSRF-cookie: страница с формой
+    должна перерисоваться, если сменился токен.
+    """
+    stamps = page_tag_stamps(tags)
+    parts = (
+        *parts,
+        latest,
+        [version for version, _ in stamps],
+        request.user.pk,
+        request.META.get('CSRF_COOKIE'),
+    )
+    etag = hashlib.md5(repr(parts).encode()).hexdigest()
+    changes = [changed_at for _, changed_at in stamps]
+    if latest is not None:
+        changes.append(latest)
+    return etag, max(changes)
+
+
+def _latest_visible(posts):
+    """Дата самого нового поста, видимого в ленте сейчас.
+
+    Один шаг по индексу (pub_date, id) опубликованных постов; внутри
+    корзины времени ленты результат берётся из кеша.
+    """
+    rows = cached_rows(posts.published(feed_now()).order_by(
+        '-pub_date',
+    ).values_list('pub_date', flat=True)[:1])
+    return rows[0] if rows else None
+
+
+def post_detail_state(request, id):
+    """Валидаторы страницы поста; для скрытого поста их нет."""
+    visible = Post.objects.published().filter(
+        category__is_published=True,
+        pk=id,
+    ).exists()
+    if not visible:
+        return None
+    return _validators(request, (), [f'post:{id}'])
+
+
+def index_state(request):
+    return _list_validators(
+        request,
+        ['feed'],
+        _latest_visible(Post.objects.filter(category__is_published=True)),
+    )
+
+
+def category_state(request, category_slug):
+    return _list_validators(
+        request,
+        [f'category:{category_slug}'],
+        _latest_visible(Post.objects.filter(
+            category__slug=category_slug,
+            category__is_published=True,
+        )),
+    )
+
+
+def profile_state(request, username):
+    # автор видит в профиле и отложенные посты, они меняются только
+    # через сигналы.
+    latest = None
+    if username != request.user.username:
+        latest = _latest_visible(
+            Post.objects.filter(author__username=username)
+        )
+    return _list_validators(request, [f'author:{username}'], latest)
+
+
+def conditional_page(get_state):
+    """Отвечает 304 на If-None-Match/If-Modified-Since без рендера.
+
+    Оба валидатора считаются одним вызовом get_state за запрос.
+    """
+    def state(request, *args, **kwargs):
+        if not hasattr(request, '_blog_page_state'):
+            request._blog_page_state = get_state(request, *args, **kwargs)
+        return request._blog_page_state
+
+    def etag(request, *args, **kwargs):
+        validators = state(request, *args, **kwargs)
+        return validators and validators[0]
+
+    def last_modified(request, *args, **kwargs):
+        validators = state(request, *args, **kwargs)
+        return validators and validators[1]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,270 @@
+import math
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comments, Location, Post
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Доли «особых» объектов в сгенерированных данных.
+SHARE_UNPUBLISHED = 0.05
+SHARE_FUTURE = 0.03
+SHARE_HIDDEN_CATEGORIES = 0.1
+SHARE_HIDDEN_LOCATIONS = 0.1
+SHARE_WITHOUT_LOCATION = 0.15
+
+# Показатель закона Ципфа для популярности авторов: первый автор пишет
+# примерно вдвое больше второго, втрое больше третьего и т. д.
+AUTHOR_SKEW = 1.1
+
+# На какой срок в прошлое и будущее разбросаны даты публикаций.
+HISTORY_DAYS = 3 * 365
+FUTURE_DAYS = 30
+
+MAX_COMMENTS_PER_POST = 1000
+
+# Размер пулов имён и предложений Faker: генерировать текст для каждой
+# из миллионов строк слишком долго.
+TEXT_POOL_SIZE = 1000
+
+
+def _poisson(rng, mean):
+    if mean > 30:
+        return max(round(rng.gauss(mean, math.sqrt(mean))), 0)
+    limit = math.exp(-mean)
+    count, product = 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def parse_distribution(spec):
+    """Функция rng -> число комментариев по описанию распределения.
+
+    Поддерживаются 'N' или 'fixed:N' (ровно N), 'poisson:MEAN' и
+    'pareto:ALPHA' — тяжёлый хвост: у большинства постов комментариев
+    нет или мало, у немногих «горячих» — сотни.
+    """
+    kind, _, value = spec.partition(':')
+    if not value:
+        kind, value = 'fixed', kind
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f'Неверный параметр распределения: {spec}')
+    if number < 0:
+        raise ValueError(f'Параметр распределения отрицательный: {spec}')
+    if kind == 'fixed':
+        return lambda rng: int(number)
+    if kind == 'poisson':
+        return lambda rng: min(_poisson(rng, number), MAX_COMMENTS_PER_POST)
+    if kind == 'pareto' and number > 0:
+        return lambda rng: min(
+            int(rng.paretovariate(number)) - 1, MAX_COMMENTS_PER_POST
+        )
+    raise ValueError(f'Неизвестное распределение: {spec}')
+
+
+class DataGenerator:
+    """Наполняет базу синтетическими пользователями, постами и комментариями.
+
+    Данные неравномерны, как на живом сайте: немногие авторы пишут
+    большую часть постов и комментариев, число комментариев у постов
+    распределено по comments_per_post, часть постов снята с публикации
+    или отложена, часть категорий и локаций скрыта. Строки вставляются
+    через bulk_create пачками по batch_size с явными id, поэтому
+    комментарии создаются вместе со своими постами без повторного чтения
+    из базы. При одинаковом seed набор данных одинаков.
+    """
+
+    def __init__(self, users, posts, comments_per_post='pareto:1.5',
+                 categories=50, locations=200, seed=0,
+                 batch_size=DEFAULT_BATCH_SIZE, using='default', now=None):
+        self.users = max(users, 1)
+        self.posts = posts
+        self.comments_per_post = parse_distribution(comments_per_post)
+        self.categories = max(categories, 1)
+        self.locations = locations
+        self.batch_size = batch_size
+        self.using = using
+        self.now = now or timezone.now()
+        self.rng = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.stats = {}
+
+    def _next_pk(self, model):
+        last = model._base_manager.using(self.using).aggregate(
+            last=Max('pk'))['last']
+        return (last or 0) + 1
+
+    def _bulk_create(self, *batches):
+        """Вставляет пачки (модель, объекты) в одной транзакции."""
+        with transaction.atomic(using=self.using):
+            for model, objects in batches:
+                started = time.monotonic()
+                model._base_manager.using(self.using).bulk_create(
+                    objects, batch_size=self.batch_size
+                )
+                label = model._meta.label_lower
+                count, seconds = self.stats.get(label, (0, 0))
+                self.stats[label] = (
+                    count + len(objects),
+                    seconds + time.monotonic() - started,
+                )
+
+    def _make_pools(self):
+        self.first_names = [
+            self.faker.first_name() for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.last_names = [
+            self.faker.last_name() for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.logins = [self.faker.user_name() for _ in range(TEXT_POOL_SIZE)]
+        self.sentences = [
+            self.faker.sentence(nb_words=10) for _ in range(TEXT_POOL_SIZE)
+        ]
+
+    def _generate_users(self):
+        rng = self.rng
+        password = make_password(None)
+        start = self._next_pk(User)
+        batch = []
+        for pk in range(start, start + self.users):
+            batch.append(User(
+                pk=pk,
+                username=f'{rng.choice(self.logins)}_{pk}',
+                first_name=rng.choice(self.first_names),
+                last_name=rng.choice(self.last_names),
+                password=password,
+            ))
+            if len(batch) >= self.batch_size:
+                self._bulk_create((User, batch))
+                batch = []
+        if batch:
+            self._bulk_create((User, batch))
+        return list(range(start, start + self.users))
+
+    def _hidden(self, total, share):
+        """Номера скрытых объектов: ровно share от total, но хотя бы один."""
+        count = max(round(total * share), 1) if total > 1 else 0
+        return set(self.rng.sample(range(total), count))
+
+    def _generate_categories(self):
+        rng = self.rng
+        start = self._next_pk(Category)
+        hidden = self._hidden(self.categories, SHARE_HIDDEN_CATEGORIES)
+        self._bulk_create((Category, [
+            Category(
+                pk=pk,
+                title=self.faker.word().capitalize()[:256],
+                description=rng.choice(self.sentences),
+                slug=f'category-{pk}',
+                is_published=number not in hidden,
+            )
+            for number, pk in enumerate(
+                range(start, start + self.categories))
+        ]))
+        return list(range(start, start + self.categories))
+
+    def _generate_locations(self):
+        start = self._next_pk(Location)
+        hidden = self._hidden(self.locations, SHARE_HIDDEN_LOCATIONS)
+        self._bulk_create((Location, [
+            Location(
+                pk=pk,
+                name=self.faker.city()[:256],
+                is_published=number not in hidden,
+            )
+            for number, pk in enumerate(
+                range(start, start + self.locations))
+        ]))
+        return list(range(start, start + self.locations))
+
+    def _pub_date(self):
+        if self.rng.random() < SHARE_FUTURE:
+            return self.now + timedelta(
+                seconds=self.rng.uniform(3600, FUTURE_DAYS * 86400)
+            )
+        return self.now - timedelta(
+            seconds=self.rng.uniform(0, HISTORY_DAYS * 86400)
+        )
+
+    def _text(self, sentences):
+        return ' '.join(self.rng.choices(self.sentences, k=sentences))
+
+    def _generate_posts(self, user_ids, category_ids, location_ids):
+        rng = self.rng
+        # популярность авторов по закону Ципфа; выбор по накопленным весам
+        # стоит O(log n) на пост.
+        weights = list(accumulate(
+            1 / rank ** AUTHOR_SKEW for rank in range(1, len(user_ids) + 1)
+        ))
+        start = self._next_pk(Post)
+        posts, comments = [], []
+        for pk in range(start, start + self.posts):
+            is_published = rng.random() >= SHARE_UNPUBLISHED
+            pub_date = self._pub_date()
+            # комментарии бывают только у уже видимых постов.
+            visible = is_published and pub_date <= self.now
+            comment_count = self.comments_per_post(rng) if visible else 0
+            posts.append(Post(
+                pk=pk,
+                title=rng.choice(self.sentences)[:256],
+                text=self._text(rng.randint(1, 8)),
+                pub_date=pub_date,
+                is_published=is_published,
+                author_id=rng.choices(user_ids, cum_weights=weights)[0],
+                category_id=rng.choice(category_ids),
+                location_id=(
+                    rng.choice(location_ids)
+                    if location_ids and rng.random() >= SHARE_WITHOUT_LOCATION
+                    else None
+                ),
+                comment_count=comment_count,
+            ))
+            for author_id in rng.choices(
+                    user_ids, cum_weights=weights, k=comment_count):
+                comments.append(Comments(
+                    post_id=pk, author_id=author_id,
+                    text=self._text(rng.randint(1, 3)),
+                ))
+            # комментарии ссылаются на посты: посты пачки вставляются
+            # раньше них.
+            if len(posts) >= self.batch_size or (
+                    len(comments) >= self.batch_size):
+                self._bulk_create((Post, posts), (Comments, comments))
+                posts, comments = [], []
+        self._bulk_create((Post, posts), (Comments, comments))
+
+    def generate(self):
+        """Создаёт данные; возвращает stats: {модель: (строк, секунд)}."""
+        self._make_pools()
+        user_ids = self._generate_users()
+        category_ids = self._generate_categories()
+        location_ids = self._generate_locations()
+        self._generate_posts(user_ids, category_ids, location_ids)
+        # id заданы явно, поэтому последовательности (в PostgreSQL)
+        # нужно подвинуть вручную.
+        connection = connections[self.using]
+        sequence_sql = connection.ops.sequence_reset_sql(
+            no_style(), [User, Category, Location, Post, Comments]
+        )
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+        return self.stats
@@ -0,0 +1,87 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+from blog.models import Comments, Post
+
+# Сколько строк читать из базы за раз при выгрузке.
+EXPORT_CHUNK_SIZE = 2000
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+
+CONTENT_TYPES = {
+    FORMAT_CSV: 'text/csv; charset=utf-8',
+    FORMAT_JSONL: 'application/x-ndjson; charset=utf-8',
+}
+
+# Колонки выгрузки: имя колонки и функция, достающая значение из объекта.
+COLUMNS = {
+    Post: (
+        ('id', lambda post: post.pk),
+        ('title', lambda post: post.title),
+        ('text', lambda post: post.text),
+        ('pub_date', lambda post: post.pub_date.isoformat()),
+        ('is_published', lambda post: post.is_published),
+        ('created_at', lambda post: post.created_at.isoformat()),
+        ('author', lambda post: post.author.username),
+        ('category', lambda post: post.category and post.category.slug),
+        ('location', lambda post: post.location and post.location.name),
+        ('comment_count', lambda post: post.comment_count),
+    ),
+    Comments: (
+        ('id', lambda comment: comment.pk),
+        ('post', lambda comment: comment.post_id),
+        ('author', lambda comment: comment.author.username),
+        ('text', lambda comment: comment.text),
+        ('created_at', lambda comment: comment.created_at.isoformat()),
+    ),
+}
+
+RELATED = {
+    Post: ('author', 'category', 'location'),
+    Comments: ('author',),
+}
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку, а не пишет."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки выгрузки как словари; из базы читается по chunk_size строк."""
+    columns = COLUMNS[queryset.model]
+    objects = queryset.select_related(
+        *RELATED[queryset.model]
+    ).order_by('pk').iterator(chunk_size=chunk_size)
+    for obj in objects:
+        yield {name: value(obj) for name, value in columns}
+
+
+def stream_export(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Выгрузка queryset построчно в CSV (с заголовком) или JSON Lines."""
+    rows = export_rows(queryset, chunk_size)
+    if export_format == FORMAT_JSONL:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+        return
+    names = [name for name, _ in COLUMNS[queryset.model]]
+    writer = csv.DictWriter(_Echo(), fieldnames=names)
+    yield writer.writerow(dict(zip(names, names)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_response(queryset, export_format):
+    """Потоковый ответ с выгрузкой: первая строка уходит сразу."""
+    response = StreamingHttpResponse(
+        (line.encode() for line in stream_export(queryset, export_format)),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    filename = f'{queryset.model._meta.model_name}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
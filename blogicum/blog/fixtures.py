@@ -0,0 +1,198 @@
+import json
+import os
+import tempfile
+import time
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import connections, transaction
+
+# Сколько символов читать из файла фикстуры за раз.
+READ_CHUNK = 1 << 16
+
+
+def iter_json_array(file):
+    """Отдаёт элементы JSON-массива по одному, не читая файл целиком.
+
+    Памяти нужно столько, сколько занимает самый большой элемент плюс
+    READ_CHUNK символов.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        # пропускаем пробелы, скобку массива и запятые между элементами.
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            if buffer[position] == '[':
+                started = True
+            position += 1
+        if position < len(buffer) and started:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # объект ещё не дочитан целиком.
+                pass
+            else:
+                position = end
+                yield item
+                continue
+        chunk = file.read(READ_CHUNK)
+        if not chunk:
+            if buffer[position:].strip():
+                raise ValueError('Фикстура обрывается на середине объекта.')
+            return
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def _dependencies(model, labels):
+    """Модели из labels, на которые ссылается model (FK и M2M)."""
+    related = set()
+    for field in model._meta.get_fields():
+        # только прямые связи: обратные создаются Django автоматически.
+        if field.is_relation and not field.auto_created and (
+                field.concrete or field.many_to_many):
+            target = field.related_model
+            if target is not None and target is not model:
+                label = target._meta.label_lower
+                if label in labels:
+                    related.add(label)
+    return related
+
+
+def load_order(labels):
+    """Порядок загрузки моделей: сначала те, на которые ссылаются другие."""
+    pending = {
+        label: _dependencies(apps.get_model(label), labels)
+        for label in labels
+    }
+    order = []
+    while pending:
+        ready = sorted(
+            label for label, deps in pending.items() if not deps - set(order)
+        )
+        if not ready:
+            # цикл ссылок: разрываем его на одной модели.
+            ready = sorted(pending)[:1]
+        order.extend(ready)
+        for label in ready:
+            del pending[label]
+    return order
+
+
+class StreamingLoader:
+    """Загружает большую JSON-фикстуру пачками с постоянным расходом памяти.
+
+    Первый проход раскладывает объекты по временным файлам моделей (JSON
+    Lines), второй вставляет их пачками по batch_size в порядке
+    зависимостей, каждую пачку в своей транзакции.
+    """
+
+    def __init__(self, batch_size=1000, using='default', exclude=(),
+                 ignore_conflicts=False):
+        self.batch_size = batch_size
+        self.using = using
+        self.exclude = set(exclude)
+        self.ignore_conflicts = ignore_conflicts
+        self.stats = {}
+
+    def _excluded(self, label):
+        return label in self.exclude or label.split('.')[0] in self.exclude
+
+    def _spool(self, fixture, directory):
+        files = {}
+        try:
+            for item in iter_json_array(fixture):
+                label = item['model'].lower()
+                if self._excluded(label):
+                    continue
+                if label not in files:
+                    files[label] = open(
+                        os.path.join(directory, f'{label}.jsonl'),
+                        'w', encoding='utf-8',
+                    )
+                files[label].write(json.dumps(item, ensure_ascii=False))
+                files[label].write('\n')
+        finally:
+            for file in files.values():
+                file.close()
+        return list(files)
+
+    def _insert(self, model, batch):
+        objects = [deserialized.object for deserialized in batch]
+        fields = model._meta.local_concrete_fields
+        queryset = model._base_manager.using(self.using)
+        # не больше параметров в одном INSERT, чем позволяет СУБД.
+        size = connections[self.using].ops.bulk_batch_size(fields, objects)
+        for start in range(0, len(objects), max(size, 1)):
+            # bulk_create перезаписал бы auto_now/auto_now_add временем
+            # загрузки; «сырая» вставка, как у loaddata, сохраняет даты
+            # из дампа.
+            queryset._insert(
+                objects[start:start + size],
+                fields=fields,
+                using=self.using,
+                raw=True,
+                ignore_conflicts=self.ignore_conflicts,
+            )
+        for name in {name for item in batch for name in item.m2m_data}:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            through._base_manager.using(self.using).bulk_create(
+                [
+                    through(**{
+                        f'{source}_id': item.object.pk,
+                        f'{target}_id': related_pk,
+                    })
+                    for item in batch
+                    for related_pk in item.m2m_data.get(name, ())
+                ],
+                ignore_conflicts=self.ignore_conflicts,
+            )
+
+    def _load_model(self, label, path):
+        model = apps.get_model(label)
+        count = 0
+        started = time.monotonic()
+        with open(path, encoding='utf-8') as file:
+            objects = Deserializer(
+                (json.loads(line) for line in file),
+                using=self.using,
+                ignorenonexistent=True,
+            )
+            batch = []
+            for deserialized in objects:
+                batch.append(deserialized)
+                if len(batch) >= self.batch_size:
+                    with transaction.atomic(using=self.using):
+                        self._insert(model, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                with transaction.atomic(using=self.using):
+                    self._insert(model, batch)
+                count += len(batch)
+        self.stats[label] = (count, time.monotonic() - started)
+        return model
+
+    def load(self, fixture):
+        """Загружает фикстуру из открытого файла; возвращает модели."""
+        with tempfile.TemporaryDirectory() as directory:
+            labels = self._spool(fixture, directory)
+            models = [
+                self._load_model(
+                    label, os.path.join(directory, f'{label}.jsonl')
+                )
+                for label in load_order(labels)
+            ]
+        connection = connections[self.using]
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+        return models
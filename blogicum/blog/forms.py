@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth import get_user_model
 
 from blog.models import Comments, Post
+from blog.tasks import process_post_image
 
 # Получаем модель пользователя:
 User = get_user_model()
@@ -20,6 +21,16 @@ class PostForm(forms.ModelForm):
             )
         }
 
+    def save(self, commit=True):
+        if 'image' in self.changed_data:
+            self.instance.image_meta = {}
+        post = super().save(commit)
+        # картинку обрабатывает воркер: имя файла известно только после
+        # сохранения поста, а Pillow слишком медленный для запроса.
+        if commit and 'image' in self.changed_data and post.image:
+            process_post_image.delay(post.pk)
+        return post
+
 
 class CommentsForm(forms.ModelForm):
     """Форма создания/изменения комментария на основе модели"""
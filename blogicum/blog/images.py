@@ -0,0 +1,206 @@
+import base64
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Параметры сохранения уменьшенных копий по формату Pillow.
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 4},
+}
+
+CONTENT_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+}
+
+# Формат ресайза по расширению оригинала; остальное (GIF, BMP) отдаётся
+# как PNG.
+FORMATS_BY_EXTENSION = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.webp': 'WEBP',
+}
+
+# Каталог кеша ресайзов внутри MEDIA_ROOT.
+RESIZED_DIR = '_resized'
+
+# Сторона превью-заглушки, которая показывается до загрузки картинки.
+PLACEHOLDER_SIZE = 16
+
+
+def derivative_name(name, width):
+    """Имя уменьшенной копии рядом с оригиналом: photo.jpg -> photo.w640.jpg"""
+    root, ext = os.path.splitext(name)
+    return f'{root}.w{width}{ext}'
+
+
+def _resized(image, width):
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _encoded(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **SAVE_OPTIONS[image_format])
+    return buffer.getvalue()
+
+
+def _placeholder(image):
+    preview = image.convert('RGB')
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = BytesIO()
+    preview.save(buffer, format='JPEG', quality=40)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/jpeg;base64,{encoded}'
+
+
+def describe(file):
+    """Метаданные картинки для шаблонов: размеры, заглушка, ширины копий.
+
+    Считаются один раз при загрузке, чтобы при рендере не открывать файл.
+    """
+    try:
+        image = Image.open(file)
+        animated = getattr(image, 'is_animated', False)
+        image = ImageOps.exif_transpose(image)
+        return {
+            'width': image.width,
+            'height': image.height,
+            'placeholder': _placeholder(image),
+            'widths': [] if animated else [
+                width for width in sorted(settings.BLOG_IMAGE_WIDTHS)
+                if width < image.width
+            ],
+        }
+    finally:
+        file.seek(0)
+
+
+def make_derivatives(image, widths, force=False):
+    """Сохраняет уменьшенные копии картинки поста заданных ширин.
+
+    Возвращает число сохранённых файлов.
+    """
+    storage = image.storage
+    names = {width: derivative_name(image.name, width) for width in widths}
+    if not force:
+        names = {
+            width: name for width, name in names.items()
+            if not storage.exists(name)
+        }
+    if not names:
+        return 0
+    with storage.open(image.name) as source:
+        original = Image.open(source)
+        original_format = original.format
+        original = ImageOps.exif_transpose(original)
+        for width, name in names.items():
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(
+                _encoded(_resized(original, width), original_format)
+            ))
+    return len(names)
+
+
+def srcset(image, meta):
+    """Значение srcset по метаданным картинки, без обращения к диску."""
+    if not meta.get('widths'):
+        return ''
+    storage = image.storage
+    candidates = [
+        f'{storage.url(derivative_name(image.name, width))} {width}w'
+        for width in meta['widths']
+    ]
+    candidates.append(f'{image.url} {meta["width"]}w')
+    return ', '.join(candidates)
+
+
+def _resized_format(name, webp):
+    if webp:
+        return 'WEBP'
+    extension = os.path.splitext(name)[1].lower()
+    return FORMATS_BY_EXTENSION.get(extension, 'PNG')
+
+
+def _resized_path(name, width, image_format):
+    digest = hashlib.sha1(name.encode()).hexdigest()
+    return os.path.join(
+        settings.MEDIA_ROOT,
+        RESIZED_DIR,
+        f'{digest}.w{width}.{image_format.lower()}',
+    )
+
+
+def open_resized(name, width, webp):
+    """Открывает готовый ресайз из дискового кеша.
+
+    Возвращает (файл, content type) или None, если ресайза в кеше нет.
+    Время изменения файла обновляется: по нему вытесняются самые давно
+    отданные варианты.
+    """
+    image_format = _resized_format(name, webp)
+    path = _resized_path(name, width, image_format)
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return file, CONTENT_TYPES[image_format]
+
+
+def save_resized(name, width, webp):
+    """Делает ресайз оригинала до width (без увеличения) и кладёт в кеш."""
+    image_format = _resized_format(name, webp)
+    path = _resized_path(name, width, image_format)
+    with default_storage.open(name) as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        if width < original.width:
+            original = _resized(original, width)
+        data = _encoded(original, image_format)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # пишем во временный файл и переименовываем, чтобы параллельный
+    # запрос не отдал недописанную картинку.
+    descriptor, temporary = tempfile.mkstemp(dir=directory)
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+    evict_resized(settings.BLOG_IMAGE_CACHE_MAX_BYTES)
+
+
+def evict_resized(max_bytes):
+    """Удаляет самые давно отданные ресайзы, пока кеш больше max_bytes."""
+    directory = os.path.join(settings.MEDIA_ROOT, RESIZED_DIR)
+    entries = []
+    with os.scandir(directory) as files:
+        for entry in files:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment,
+)
+
+from blog.benchmark import (
+    DEFAULT_SLACK_MS, DEFAULT_TOLERANCE, compare, run_benchmark,
+)
+from blog.datagen import DataGenerator
+from blog.models import Post
+
+DEFAULT_BASELINE = settings.BASE_DIR.parent / 'benchmarks' / 'baseline.json'
+
+# Поля отчёта, которые должны совпадать с базовой линией, чтобы замеры
+# можно было сравнивать.
+COMPARABLE_META = ('posts', 'comments', 'users', 'repeat', 'warm',
+                   'database')
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время ответа и число запросов страниц блога на '
+            'синтетических данных в отдельной тестовой базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--users', type=int,
+            help='По умолчанию — один автор на 50 постов.',
+        )
+        parser.add_argument(
+            '--comments-per-post', default='pareto:1.5',
+            help='Распределение числа комментариев, как у '
+                 'generate_blog_data.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз запрашивать каждую страницу.',
+        )
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не очищать кеш между запросами.',
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую базу и переиспользовать её данные. '
+                 'Тестовая база SQLite без DATABASES[...][\'TEST\'][\'NAME\'] '
+                 'живёт в памяти, и флаг на ней ничего не даёт.',
+        )
+        parser.add_argument(
+            '-o', '--output', help='Куда записать JSON-отчёт.',
+        )
+        parser.add_argument(
+            '--baseline', default=str(DEFAULT_BASELINE),
+            help='Базовая линия для сравнения.',
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Сохранить отчёт как новую базовую линию.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+            help='Допустимый относительный рост p95.',
+        )
+        parser.add_argument(
+            '--slack-ms', type=float, default=DEFAULT_SLACK_MS,
+            help='Допустимый абсолютный рост p95, мс.',
+        )
+
+    def handle(self, *args, **options):
+        baseline = Path(options['baseline'])
+        if not options['save_baseline'] and not baseline.exists():
+            raise CommandError(
+                f'Базовой линии {baseline} нет. Снимите её с '
+                '--save-baseline на той же конфигурации.'
+            )
+        if options['keepdb'] and connection.vendor == 'sqlite' and not (
+                connection.settings_dict['TEST']['NAME']):
+            self.stdout.write(self.style.WARNING(
+                'Тестовая база SQLite в памяти, --keepdb ничего не даёт.'
+            ))
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'],
+        )
+        try:
+            if not Post.objects.exists():
+                self.stdout.write('Генерация данных…')
+                DataGenerator(
+                    users=options['users'] or options['posts'] // 50,
+                    posts=options['posts'],
+                    comments_per_post=options['comments_per_post'],
+                    seed=options['seed'],
+                ).generate()
+            report = run_benchmark(options['repeat'], options['warm'])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'],
+            )
+            teardown_test_environment()
+
+        for name, result in report['results'].items():
+            self.stdout.write(
+                f'{name:16} запросов {result["queries"]:3}  '
+                f'p50 {result["p50_ms"]:8.1f} мс  '
+                f'p95 {result["p95_ms"]:8.1f} мс  '
+                f'p99 {result["p99_ms"]:8.1f} мс'
+            )
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(text, encoding='utf-8')
+
+        if options['save_baseline']:
+            baseline.parent.mkdir(parents=True, exist_ok=True)
+            baseline.write_text(text, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовая линия сохранена в {baseline}'
+            ))
+            return
+        expected = json.loads(baseline.read_text(encoding='utf-8'))
+        mismatched = [
+            key for key in COMPARABLE_META
+            if expected['meta'].get(key) != report['meta'][key]
+        ]
+        if mismatched:
+            raise CommandError(
+                f'Базовая линия {baseline} снята на другой конфигурации: '
+                + ', '.join(
+                    f'{key} {expected["meta"].get(key)} вместо '
+                    f'{report["meta"][key]}' for key in mismatched
+                )
+            )
+        regressions = compare(
+            report, expected, options['tolerance'], options['slack_ms'],
+        )
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from blog.export import (
+    EXPORT_CHUNK_SIZE, FORMAT_CSV, FORMAT_JSONL, stream_export,
+)
+from blog.models import Comments, Post
+
+MODELS = {
+    'posts': Post,
+    'comments': Comments,
+}
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты или комментарии в CSV или JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('content', choices=sorted(MODELS))
+        parser.add_argument(
+            '--format',
+            choices=(FORMAT_CSV, FORMAT_JSONL),
+            default=FORMAT_CSV,
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки; по умолчанию stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        lines = stream_export(
+            MODELS[options['content']].objects.all(),
+            options['format'],
+            options['chunk_size'],
+        )
+        if options['output']:
+            # newline='' — переводы строк внутри CSV уже расставлены.
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,75 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.datagen import DEFAULT_BATCH_SIZE, DataGenerator
+from blog.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Генерирует большой синтетический набор пользователей, постов '
+            'и комментариев с реалистичным перекосом популярности.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--comments-per-post',
+            default='pareto:1.5',
+            help="Распределение числа комментариев: 'N', 'fixed:N', "
+                 "'poisson:MEAN' или 'pareto:ALPHA'.",
+        )
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Алиас базы данных.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        try:
+            generator = DataGenerator(
+                users=options['users'],
+                posts=options['posts'],
+                comments_per_post=options['comments_per_post'],
+                categories=options['categories'],
+                locations=options['locations'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                using=options['database'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        started = time.monotonic()
+        stats = generator.generate()
+        elapsed = time.monotonic() - started
+
+        total = 0
+        for label, (count, seconds) in stats.items():
+            total += count
+            self.stdout.write(
+                f'{label}: {count} строк за {seconds:.2f} с '
+                f'({count / max(seconds, 1e-6):.0f} строк/с)'
+            )
+        # bulk_create не вызывает сигналы: поисковый индекс и кеш
+        # обновляем сами.
+        if fts_available():
+            rebuild_index()
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.2f} с'
+        ))
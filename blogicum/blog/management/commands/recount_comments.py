@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comments, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики комментариев постов.'
+
+    def handle(self, *args, **options):
+        counts = Comments.objects.filter(
+            post=OuterRef('pk'),
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        with transaction.atomic():
+            drifted = Post.objects.annotate(
+                actual=Coalesce(Subquery(counts), 0),
+            ).exclude(comment_count=F('actual'))
+            fixed = Post.objects.filter(
+                pk__in=drifted.values('pk'),
+            ).update(comment_count=Coalesce(Subquery(counts), 0))
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {fixed}'
+        ))
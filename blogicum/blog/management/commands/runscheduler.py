@@ -0,0 +1,17 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import PublicationScheduler
+
+
+class Command(BaseCommand):
+    help = ('Следит за отложенными публикациями и объявляет посты, '
+            'у которых наступила дата публикации.')
+
+    def handle(self, *args, **options):
+        scheduler = PublicationScheduler()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: scheduler.stop())
+        self.stdout.write('Планировщик публикаций запущен.')
+        scheduler.run_forever()
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.fixtures import StreamingLoader
+from blog.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Загружает большую JSON-фикстуру (например, db.json) потоково, '
+            'пачками через массовую вставку.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к JSON-фикстуре.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько объектов вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '-e', '--exclude',
+            action='append',
+            default=[],
+            help='Пропустить приложение или модель (app или app.Model).',
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать объекты, которые уже есть в базе.',
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Алиас базы данных для загрузки.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        loader = StreamingLoader(
+            batch_size=options['batch_size'],
+            using=options['database'],
+            exclude=[label.lower() for label in options['exclude']],
+            ignore_conflicts=options['ignore_conflicts'],
+        )
+        try:
+            with open(options['fixture'], encoding='utf-8') as fixture:
+                models = loader.load(fixture)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось загрузить фикстуру: {error}')
+
+        total = elapsed = 0
+        for label, (count, seconds) in loader.stats.items():
+            total += count
+            elapsed += seconds
+            self.stdout.write(
+                f'{label}: {count} объектов за {seconds:.2f} с '
+                f'({count / max(seconds, 1e-6):.0f} объектов/с)'
+            )
+        # массовая вставка не вызывает сигналы: пересчитываем то, что
+        # они поддерживают.
+        if any(model._meta.app_label == 'blog' for model in models):
+            call_command(
+                'recount_comments', stdout=self.stdout, stderr=self.stderr
+            )
+            if fts_available():
+                rebuild_index()
+            cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-6):.0f} объектов/с)'
+        ))
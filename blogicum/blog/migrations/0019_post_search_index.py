@@ -0,0 +1,44 @@
+from django.db import migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+CREATE_SQL = f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text, category, location,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+FILL_SQL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, text, category, location)
+    SELECT p.id, p.title, p.text,
+           COALESCE(c.title, ''), COALESCE(l.name, '')
+    FROM blog_post p
+    LEFT JOIN blog_category c ON c.id = p.category_id
+    LEFT JOIN blog_location l ON l.id = p.location_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 есть только в SQLite; на других СУБД поиск работает без индекса.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
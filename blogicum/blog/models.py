@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 # Получаем модель пользователя:
 User = get_user_model()
@@ -17,11 +18,27 @@ class BaseTableRows(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено',
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        null=True,
+        verbose_name='Изменено',
+    )
 
     class Meta:
         abstract = True
 
 
+class PostQuerySet(models.QuerySet):
+    """Выборки публикаций."""
+
+    def published(self, now=None):
+        """Опубликованные посты с наступившей датой публикации."""
+        return self.filter(
+            is_published=True,
+            pub_date__lte=now or timezone.now(),
+        )
+
+
 class Post(BaseTableRows):
     """ОРМ модель: Публикация"""
     title = models.CharField(
@@ -61,11 +78,47 @@ class Post(BaseTableRows):
         related_name='posts',
         verbose_name='Категория',
     )
+    image_meta = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Метаданные картинки',
+        help_text='Размеры, превью-заглушка и ширины уменьшенных копий.',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        # индексы под фильтры и сортировку лент из blog/views.py.
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            # сортировка и date_hierarchy списка постов в админке.
+            models.Index(
+                fields=('pub_date',),
+                name='post_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -137,3 +190,14 @@ class Comments(models.Model):
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comments_post_created_at_idx',
+            ),
+            # date_hierarchy списка комментариев в админке.
+            models.Index(
+                fields=('created_at',),
+                name='comments_created_at_idx',
+            ),
+        )
@@ -0,0 +1,231 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.cache import (
+    cached_rows, queryset_cache_key, remember_page_posts,
+)
+from monitoring.metrics import record_cache_lookup
+
+# Режимы пагинации лент публикаций.
+PAGINATION_PAGES = 'pages'
+PAGINATION_CURSOR = 'cursor'
+
+# Режимы подсчёта публикаций для постраничной пагинации.
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATED = 'estimated'
+
+# Поля постов, которые меняются без сброса кеша выборок ленты:
+# комментарии сбрасывают только страницы своего поста.
+FRESH_FIELDS = ('comment_count',)
+
+CURSOR_NEXT = 'n'  # Курсор указывает на более старые публикации.
+CURSOR_PREVIOUS = 'p'  # Курсор указывает на более новые публикации.
+
+
+def encode_cursor(direction, obj, field='pub_date'):
+    """Упаковывает позицию (дата из field, id) в непрозрачный токен."""
+    raw = f'{direction}|{getattr(obj, field).isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен; для битого токена возвращает None."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4)
+        ).decode()
+        direction, pub_date, pk = raw.split('|')
+        if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+            return None
+        return direction, datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class CountCachingPaginator(Paginator):
+    """Paginator с дешёвым и кешируемым подсчётом объектов.
+
+    Количество считается по count_queryset — базовой выборке без
+    аннотаций и select_related, — а не оборачивает в подзапрос всю
+    аннотированную выборку. Результат кешируется по SQL подсчёта на
+    BLOG_PAGINATOR_COUNT_TIMEOUT секунд.
+
+    В режиме 'estimated' подсчёт останавливается на
+    BLOG_PAGINATOR_COUNT_LIMIT строках: для огромных таблиц это оценка
+    снизу, и пагинация показывает страницы только в её пределах.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_queryset=None,
+                 count_mode=None):
+        # порядок аргументов как у Paginator: админка передаёт их
+        # позиционно.
+        super().__init__(
+            object_list, per_page, orphans, allow_empty_first_page
+        )
+        self.count_queryset = count_queryset
+        self.count_mode = count_mode or getattr(
+            settings, 'BLOG_PAGINATOR_COUNT_MODE', COUNT_EXACT
+        )
+
+    def _get_count_queryset(self):
+        if self.count_queryset is not None:
+            queryset = self.count_queryset
+        else:
+            queryset = self.object_list
+        queryset = queryset.select_related(None).order_by()
+        if self.count_mode == COUNT_ESTIMATED:
+            limit = getattr(settings, 'BLOG_PAGINATOR_COUNT_LIMIT', 10000)
+            queryset = queryset.values('pk')[:limit]
+        return queryset
+
+    @cached_property
+    def count(self):
+        queryset = self._get_count_queryset()
+        key = queryset_cache_key('count', queryset)
+        if key is None:
+            return 0
+        count = cache.get(key)
+        record_cache_lookup('count', count is not None)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, getattr(
+                settings, 'BLOG_PAGINATOR_COUNT_TIMEOUT', 60
+            ))
+        return count
+
+
+class CursorPage:
+    """Страница ленты, не знающая общего количества публикаций."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.is_cursor = True
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(CURSOR_NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(CURSOR_PREVIOUS, self.object_list[0])
+
+
+class CursorPaginator:
+    """Пагинация по ключу (pub_date, id) вместо LIMIT/OFFSET.
+
+    Каждая страница выбирается одним запросом по индексу без COUNT(*),
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_page(self, token):
+        cursor = decode_cursor(token)
+        queryset = self.object_list
+        size = self.per_page + 1
+        if cursor is None:
+            rows = cached_rows(
+                queryset.order_by('-pub_date', '-pk')[:size], FRESH_FIELDS,
+            )
+            return CursorPage(
+                rows[:self.per_page], self,
+                has_next=len(rows) > self.per_page,
+                has_previous=False,
+            )
+        direction, pub_date, pk = cursor
+        if direction == CURSOR_NEXT:
+            rows = cached_rows(queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by('-pub_date', '-pk')[:size], FRESH_FIELDS)
+            return CursorPage(
+                rows[:self.per_page], self,
+                has_next=len(rows) > self.per_page,
+                has_previous=True,
+            )
+        rows = cached_rows(queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'pk')[:size], FRESH_FIELDS)
+        return CursorPage(
+            rows[:self.per_page][::-1], self,
+            has_next=True,
+            has_previous=len(rows) > self.per_page,
+        )
+
+
+def get_comments_page(comments, token, per_page):
+    """Страница комментариев «с конца»: самые новые идут первой страницей.
+
+    Возвращает комментарии в порядке «от старых к новым» и курсор для
+    подгрузки более ранних (None, если их нет).
+    """
+    comments = comments.order_by('-created_at', '-pk')
+    cursor = decode_cursor(token)
+    if cursor is not None:
+        _, created_at, pk = cursor
+        comments = comments.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    rows = list(comments[:per_page + 1])
+    page = rows[:per_page][::-1]
+    if len(rows) <= per_page:
+        return page, None
+    return page, encode_cursor(CURSOR_NEXT, page[0], 'created_at')
+
+
+def get_page_obj(request, queryset, per_page, count_queryset=None):
+    """Возвращает страницу ленты в режиме из BLOG_PAGINATION_MODE."""
+    mode = getattr(settings, 'BLOG_PAGINATION_MODE', PAGINATION_PAGES)
+    if mode == PAGINATION_CURSOR:
+        page_obj = CursorPaginator(queryset, per_page).get_page(
+            request.GET.get('cursor')
+        )
+    else:
+        paginator = CountCachingPaginator(
+            queryset, per_page, count_queryset=count_queryset
+        )
+        page_obj = paginator.get_page(request.GET.get('page'))
+        page_obj.object_list = cached_rows(
+            page_obj.object_list, FRESH_FIELDS,
+        )
+    remember_page_posts(request, page_obj.object_list)
+    return page_obj
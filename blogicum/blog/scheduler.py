@@ -0,0 +1,93 @@
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from blog.cache import feed_bucket_seconds, feed_now
+from blog.models import Post
+from blog.signals import post_became_visible
+
+
+def visible_at(pub_date):
+    """Момент, когда пост с этой датой появится в лентах.
+
+    Ленты сравнивают pub_date с началом текущей корзины времени
+    (feed_now), поэтому дата округляется вверх до границы корзины.
+    """
+    bucket = feed_bucket_seconds()
+    if not bucket:
+        return pub_date
+    timestamp = -(-pub_date.timestamp() // bucket) * bucket
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+class PublicationScheduler:
+    """Отправляет post_became_visible, когда наступает дата публикации.
+
+    Держит кучу ближайших дат публикации и раз в BLOG_SCHEDULER_POLL
+    секунд перечитывает только посты, чья дата попадает в окно
+    BLOG_SCHEDULER_WINDOW секунд, — так учитываются и правки дат.
+    """
+
+    def __init__(self, clock=timezone.now):
+        self.clock = clock
+        self.window = timedelta(seconds=settings.BLOG_SCHEDULER_WINDOW)
+        self.poll = timedelta(seconds=settings.BLOG_SCHEDULER_POLL)
+        self.stopping = threading.Event()
+        self.heap = []
+        self.since = clock()
+        self.next_refresh = self.since
+
+    def stop(self):
+        self.stopping.set()
+
+    def refresh(self, now):
+        """Перечитывает посты, которые станут видны в текущем окне."""
+        upcoming = Post.objects.filter(
+            is_published=True,
+            pub_date__gt=self.since,
+            pub_date__lte=now + self.window,
+        ).values_list('pub_date', 'pk')
+        self.heap = [
+            (visible_at(pub_date), pk) for pub_date, pk in upcoming
+        ]
+        heapq.heapify(self.heap)
+        self.next_refresh = now + self.poll
+
+    def run_due(self, now):
+        """Объявляет посты, ставшие видимыми к моменту now."""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[1])
+        if not due:
+            return []
+        # дату могли перенести после чтения кучи, поэтому видимость
+        # проверяется заново.
+        posts = list(Post.objects.select_related(
+            'author',
+            'category',
+        ).published(feed_now(now)).filter(
+            category__is_published=True,
+            pk__in=due,
+        ))
+        for post in posts:
+            post_became_visible.send(sender=Post, post=post)
+            self.since = max(self.since, post.pub_date)
+        return posts
+
+    def run_once(self):
+        """Один шаг цикла; возвращает паузу до следующего шага."""
+        now = self.clock()
+        if now >= self.next_refresh:
+            self.refresh(now)
+        self.run_due(now)
+        wake_at = self.next_refresh
+        if self.heap:
+            wake_at = min(wake_at, self.heap[0][0])
+        return max((wake_at - self.clock()).total_seconds(), 0)
+
+    def run_forever(self):
+        while not self.stopping.is_set():
+            self.stopping.wait(self.run_once())
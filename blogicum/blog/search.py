@@ -0,0 +1,218 @@
+import base64
+import binascii
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog.cache import feed_now
+from blog.models import Post
+
+FTS_TABLE = 'blog_post_fts'
+
+# Веса колонок для bm25: title, text, category, location.
+BM25_WEIGHTS = (10.0, 1.0, 2.0, 2.0)
+
+# Служебные маркеры подсветки: текст экранируется целиком, и только потом
+# маркеры заменяются на <mark>, поэтому HTML из постов не проходит как есть.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+INDEX_SQL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, text, category, location)
+    SELECT p.id, p.title, p.text,
+           COALESCE(c.title, ''), COALESCE(l.name, '')
+    FROM blog_post p
+    LEFT JOIN blog_category c ON c.id = p.category_id
+    LEFT JOIN blog_location l ON l.id = p.location_id
+"""
+
+
+def fts_available():
+    """Полнотекстовый индекс есть только в SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def index_posts(posts):
+    """Переиндексирует посты из выборки posts."""
+    if not fts_available():
+        return
+    try:
+        ids_sql, params = posts.values('pk').query.sql_with_params()
+    except EmptyResultSet:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({ids_sql})', params
+        )
+        cursor.execute(f'{INDEX_SQL} WHERE p.id IN ({ids_sql})', params)
+
+
+def unindex_post(pk):
+    """Убирает пост из полнотекстового индекса."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_index():
+    """Заново заполняет полнотекстовый индекс из таблицы постов."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(INDEX_SQL)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+        )
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def build_match_query(text):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 во вводе
+    не интерпретируются; последнее слово ищется по префиксу.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def matching_post_ids(text):
+    """Подзапрос с id постов, подходящих под текст, для фильтра pk__in."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [build_match_query(text)],
+    )
+
+
+def _encode_cursor(score, pk):
+    raw = f'{score!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4)
+        ).decode()
+        score, pk = raw.split('|')
+        return float(score), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _highlighted(value):
+    return mark_safe(
+        escape(value)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+def search_posts(text, token=None, limit=10):
+    """Ищет видимые посты по тексту, от самых релевантных.
+
+    Возвращает посты с атрибутами search_title и search_snippet и курсор
+    следующей страницы (None, если страница последняя).
+    """
+    if not fts_available():
+        return _search_posts_fallback(text, limit), None
+    match = build_match_query(text)
+    if match is None:
+        return [], None
+    cursor = _decode_cursor(token)
+    params = [
+        *BM25_WEIGHTS,
+        match,
+        # даты в SQLite хранятся строками в формате бэкенда Django.
+        connection.ops.adapt_datetimefield_value(feed_now()),
+    ]
+    after = ''
+    if cursor is not None:
+        after = 'AND (s.score > %s OR (s.score = %s AND s.id > %s))'
+        params += [cursor[0], cursor[0], cursor[1]]
+    params.append(limit + 1)
+    # сначала только ранжирование и страница: подсветка и сниппет дороги,
+    # и считать их для всех совпадений незачем.
+    sql = f"""
+        SELECT s.id, s.score FROM (
+            SELECT rowid AS id,
+                   bm25({FTS_TABLE}, %s, %s, %s, %s) AS score
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+        ) s
+        JOIN blog_post p ON p.id = s.id
+        JOIN blog_category c ON c.id = p.category_id
+        WHERE p.is_published AND c.is_published AND p.pub_date <= %s
+        {after}
+        ORDER BY s.score, s.id
+        LIMIT %s
+    """
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][1], rows[-1][0])
+    if not rows:
+        return [], None
+    ids = [row[0] for row in rows]
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(
+            f"""
+            SELECT rowid,
+                   highlight({FTS_TABLE}, 0, %s, %s),
+                   snippet({FTS_TABLE}, 1, %s, %s, '…', 24)
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+              AND rowid IN ({', '.join(['%s'] * len(ids))})
+            """,
+            [HIGHLIGHT_START, HIGHLIGHT_END,
+             HIGHLIGHT_START, HIGHLIGHT_END,
+             match, *ids],
+        )
+        highlights = {
+            pk: (title, snippet)
+            for pk, title, snippet in db_cursor.fetchall()
+        }
+    posts = Post.objects.select_related(
+        'author',
+        'location',
+        'category',
+    ).in_bulk(ids)
+    results = []
+    for pk in ids:
+        title, snippet = highlights[pk]
+        post = posts[pk]
+        post.search_title = _highlighted(title)
+        post.search_snippet = _highlighted(snippet)
+        results.append(post)
+    return results, next_cursor
+
+
+def _search_posts_fallback(text, limit):
+    """Поиск без FTS5 для других СУБД: подстрока в заголовке и тексте."""
+    posts = list(Post.objects.select_related(
+        'author',
+        'location',
+        'category',
+    ).published(feed_now()).filter(
+        Q(title__icontains=text) | Q(text__icontains=text),
+        category__is_published=True,
+    )[:limit])
+    for post in posts:
+        post.search_title = post.title
+        post.search_snippet = post.text
+    return posts
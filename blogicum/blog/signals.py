@@ -0,0 +1,183 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import Signal, receiver
+from django.urls import reverse
+
+from blog.cache import bump_feed_generation, bump_page_tags
+from blog.models import Category, Comments, Location, Post
+from blog.search import index_posts, unindex_post
+from blog.tasks import prerender_pages, reindex_posts
+
+# Пост с отложенной датой стал виден в лентах; отправляется планировщиком
+# публикаций (manage.py runscheduler) с аргументом post.
+post_became_visible = Signal()
+
+
+def _shift_comment_count(post_id, delta):
+    """Атомарно сдвигает счётчик комментариев поста на delta."""
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+@receiver(pre_save, sender=Comments)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    """Запоминает прежний пост комментария, если его перенесли."""
+    if raw or instance.pk is None:
+        return
+    instance._previous_post_id = sender.objects.filter(
+        pk=instance.pk,
+    ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comments)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новый комментарий в счётчике поста."""
+    if raw:
+        return
+    if created:
+        _shift_comment_count(instance.post_id, 1)
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if previous_post_id and previous_post_id != instance.post_id:
+        _shift_comment_count(previous_post_id, -1)
+        _shift_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comments)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Вычитает удалённый комментарий из счётчика поста."""
+    _shift_comment_count(instance.post_id, -1)
+
+
+def invalidate_feed_cache(sender, **kwargs):
+    """Сбрасывает закешированные выборки ленты при правке контента.
+
+    Комментарии не меняют ни состав, ни порядок лент, а их счётчик
+    перечитывается у строк из кеша (см. cached_rows), поэтому они кеш
+    выборок не сбрасывают.
+    """
+    bump_feed_generation()
+
+
+for model in (Post, Category, Location):
+    post_save.connect(invalidate_feed_cache, sender=model)
+    post_delete.connect(invalidate_feed_cache, sender=model)
+
+
+def _affected_page_tags(sender, pk):
+    """Теги страниц, на которых сейчас показана запись sender с ключом pk.
+
+    Состояние читается из базы, поэтому до сохранения это прежние
+    страницы записи, а после — новые. Комментарий затрагивает только
+    страницы своего поста: списки проверяют теги показанных на них
+    постов сами (см. remember_page_posts).
+    """
+    if sender is Comments:
+        return {
+            f'post:{post_id}' for post_id in Post.objects.filter(
+                comments__pk=pk,
+            ).values_list('pk', flat=True)
+        }
+    tags = {'feed'}
+    if sender is Post:
+        posts = Post.objects.filter(pk=pk)
+    elif sender is Category:
+        posts = Post.objects.filter(category_id=pk)
+        tags.update(
+            f'category:{slug}' for slug in Category.objects.filter(
+                pk=pk,
+            ).values_list('slug', flat=True)
+        )
+    else:
+        posts = Post.objects.filter(location_id=pk)
+    for post_id, username, slug in posts.values_list(
+            'pk', 'author__username', 'category__slug'):
+        tags.add(f'post:{post_id}')
+        tags.add(f'author:{username}')
+        if slug:
+            tags.add(f'category:{slug}')
+    return tags
+
+
+def remember_page_tags(sender, instance, raw=False, **kwargs):
+    """Запоминает страницы, где запись была видна до изменения."""
+    if raw or instance.pk is None:
+        return
+    instance._previous_page_tags = _affected_page_tags(sender, instance.pk)
+
+
+def invalidate_page_cache(sender, instance, raw=False, **kwargs):
+    """Сбрасывает страничный кеш только для затронутых страниц."""
+    if raw:
+        return
+    tags = getattr(instance, '_previous_page_tags', set())
+    if kwargs.get('signal') is post_save:
+        tags = tags | _affected_page_tags(sender, instance.pk)
+    bump_page_tags(tags)
+
+
+for model in (Post, Category, Location, Comments):
+    pre_save.connect(remember_page_tags, sender=model)
+    pre_delete.connect(remember_page_tags, sender=model)
+    post_save.connect(invalidate_page_cache, sender=model)
+    post_delete.connect(invalidate_page_cache, sender=model)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    """Обновляет пост в полнотекстовом индексе."""
+    if not raw:
+        index_posts(Post.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    """Убирает удалённый пост из полнотекстового индекса."""
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def index_related_posts(sender, instance, raw=False, **kwargs):
+    """Переиндексирует посты при смене названия категории или локации.
+
+    Постов может быть много, поэтому это делает воркер.
+    """
+    if raw:
+        return
+    post_ids = list(instance.posts.values_list('pk', flat=True))
+    if post_ids:
+        reindex_posts.delay(post_ids)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def remember_related_posts(sender, instance, **kwargs):
+    """Запоминает посты категории или локации перед её удалением."""
+    instance._related_post_ids = list(
+        instance.posts.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def index_orphaned_posts(sender, instance, **kwargs):
+    """Переиндексирует посты, оставшиеся без категории или локации."""
+    if instance._related_post_ids:
+        reindex_posts.delay(instance._related_post_ids)
+
+
+@receiver(post_became_visible)
+def announce_visible_post(sender, post, **kwargs):
+    """Сбрасывает кеш страниц, где появился пост, и заново их рендерит."""
+    bump_feed_generation()
+    bump_page_tags(_affected_page_tags(Post, post.pk))
+    prerender_pages.delay([
+        reverse('blog:index'),
+        reverse('blog:post_detail', args=[post.pk]),
+        reverse('blog:category_posts', args=[post.category.slug]),
+        reverse('blog:profile', args=[post.author.username]),
+    ])
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.urls import resolve
+
+from blog.images import describe, make_derivatives
+from blog.models import Post
+from blog.search import index_posts
+from jobs.tasks import task
+
+
+@task
+def process_post_image(post_id):
+    """Считает метаданные картинки поста и делает её уменьшенные копии."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    with post.image.storage.open(post.image.name) as file:
+        post.image_meta = describe(file)
+    make_derivatives(post.image, post.image_meta['widths'])
+    # сохранение через save() сбрасывает кеши карточки и страниц поста и
+    # их ETag; веб-процессы видят сброс, потому что кеш общий (CACHES).
+    post.save(update_fields=('image_meta',))
+
+
+@task
+def reindex_posts(post_ids):
+    """Переиндексирует посты в полнотекстовом поиске."""
+    index_posts(Post.objects.filter(pk__in=post_ids))
+
+
+@task
+def prerender_pages(urls):
+    """Прогревает страничный кеш: рендерит страницы как аноним.
+
+    Представление вызывается напрямую, без middleware, и кладёт страницу
+    в кеш под тем же ключом, что и настоящий запрос. Прогрев имеет смысл
+    только с общим для процессов кешем (см. CACHES).
+    """
+    hosts = [host for host in settings.ALLOWED_HOSTS if '*' not in host]
+    factory = RequestFactory(HTTP_HOST=hosts[0] if hosts else 'localhost')
+    for url in urls:
+        match = resolve(url)
+        request = factory.get(url)
+        request.user = AnonymousUser()
+        request.resolver_match = match
+        match.func(request, *match.args, **match.kwargs)
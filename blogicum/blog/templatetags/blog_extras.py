@@ -0,0 +1,34 @@
+from django import template
+
+from blog import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия карточки поста для ключа фрагментного кеша.
+
+    Собирается из отметок изменения поста, его категории и локации,
+    счётчика комментариев, метаданных картинки, автора и признаков
+    видимости, поэтому любая правка, влияющая на карточку, даёт новый ключ.
+    """
+    category = post.category
+    location = post.location
+    return '|'.join(str(part) for part in (
+        post.updated_at.timestamp() if post.updated_at else '',
+        post.is_published,
+        post.comment_count,
+        bool(post.image_meta),
+        post.author.username,
+        category.updated_at.timestamp() if category else '',
+        category.is_published if category else '',
+        location.updated_at.timestamp() if location else '',
+        location.is_published if location else '',
+    ))
+
+
+@register.simple_tag
+def image_srcset(post):
+    """srcset картинки поста из её уменьшенных копий."""
+    return images.srcset(post.image, post.image_meta) if post.image else ''
@@ -10,6 +10,8 @@ urlpatterns = [
     path('category/<slug:category_slug>/', views.category_posts,
          name='category_posts'),
     path('posts/<int:id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:id>/comments/', views.post_comments,
+         name='post_comments'),
     path('posts/create/', views.CreatePostView.as_view(), name='create_post'),
     path('posts/<int:post_id>/edit/', views.EditPostView.as_view(),
          name='edit_post'),
@@ -21,6 +23,10 @@ urlpatterns = [
          views.EditCommentsView.as_view(), name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>',
          views.DeleteCommentsView.as_view(), name='delete_comment'),
+    path('search/', views.search, name='search'),
+    # стоит раньше раздачи MEDIA_URL из blogicum/urls.py.
+    path('media/resized/<int:width>/<path:name>', views.resized_image,
+         name='resized_image'),
     path('profile/<username>/', views.profile, name='profile'),
     path('profile/<username>/edit', views.EditProfile.as_view(),
          name='edit_profile'),
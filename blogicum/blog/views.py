@@ -1,58 +1,106 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
-from django.db.models import Count
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
-from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_safe
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
-
+from PIL import Image, UnidentifiedImageError
+
+from blog import images
+from blog.cache import cache_anonymous_page, feed_now
+from blog.conditional import (
+    category_state, conditional_page, index_state, post_detail_state,
+    profile_state,
+)
 from blog.forms import CommentsForm, PostForm, UserUpdateForm
 from blog.models import Category, Comments, Post
+from blog.paginators import get_comments_page, get_page_obj
+from blog.search import search_posts
 
 PAGINATE_CONST = 10  # Константа количества вывода постов.
+COMMENTS_PAGINATE_CONST = 50  # Константа количества вывода комментариев.
 
 User = get_user_model()  # Обращаемся к встроенной модели User.
 
 
+@method_decorator(cache_anonymous_page('feed'), name='dispatch')
+@method_decorator(conditional_page(index_state), name='dispatch')
 class Post_Index(ListView):
     """CBV-функция списка постов(главная страница)."""
     model = Post
-    queryset = Post.objects.select_related(
-        'author',
-        'location',
-        'category',
-    ).filter(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=timezone.now(),
-    ).annotate(
-        comment_count=Count('comments',)
-    ).order_by('-pub_date',)
     template_name = 'blog/index.html'
     paginate_by = PAGINATE_CONST
 
+    def get_queryset(self):
+        # время вычисляется на каждый запрос, а не при импорте модуля.
+        return Post.objects.select_related(
+            'author',
+            'location',
+            'category',
+        ).published(
+            feed_now()
+        ).filter(
+            category__is_published=True,
+        ).order_by('-pub_date',)
+
+    def paginate_queryset(self, queryset, page_size):
+        page_obj = get_page_obj(self.request, queryset, page_size)
+        return (page_obj.paginator, page_obj, page_obj.object_list,
+                page_obj.has_other_pages())
 
-def post_detail(request, id):
-    """view-функция поста(детально)"""
-    post = get_object_or_404(
+
+def get_visible_post(id):
+    """Опубликованный пост с опубликованной категорией или 404."""
+    return get_object_or_404(
         Post.objects.select_related(
             'author',
             'location',
             'category',
-        ).filter(
-            is_published=True,
+        ).published().filter(
             category__is_published=True,
-            pub_date__lte=timezone.now(),
             id=id,
         )
     )
+
+
+@cache_anonymous_page('post:{id}')
+@conditional_page(post_detail_state)
+def post_detail(request, id):
+    """view-функция поста(детально)"""
+    post = get_visible_post(id)
+    comments, earlier_cursor = get_comments_page(
+        post.comments.select_related('author'), None, COMMENTS_PAGINATE_CONST
+    )
     context = {'post': post}
     context['form'] = CommentsForm()
-    context['comments'] = post.comments.all()
+    context['comments'] = comments
+    context['earlier_cursor'] = earlier_cursor
     return render(request, 'blog/detail.html', context)
 
 
+@cache_anonymous_page('post:{id}')
+def post_comments(request, id):
+    """view-функция фрагмента с более ранними комментариями поста."""
+    post = get_visible_post(id)
+    comments, earlier_cursor = get_comments_page(
+        post.comments.select_related('author'),
+        request.GET.get('before'),
+        COMMENTS_PAGINATE_CONST,
+    )
+    context = {
+        'post': post,
+        'comments': comments,
+        'earlier_cursor': earlier_cursor,
+    }
+    return render(request, 'includes/comments_list.html', context)
+
+
 class CreatePostView(LoginRequiredMixin, CreateView):
     """CBV-функция создания поста."""
     model = Post
@@ -66,7 +114,8 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
     def get_success_url(self):
-        return reverse_lazy('blog:profile', args=[self.object.author])
+        # автор поста — текущий пользователь, это проверено в dispatch.
+        return reverse_lazy('blog:profile', args=[self.request.user.username])
 
 
 class PostMixin:
@@ -77,7 +126,8 @@ class PostMixin:
 
     def dispatch(self, request, *args, **kwargs):
         post = self.get_object()
-        if post.author != request.user:
+        # сравниваем id, не загружая автора отдельным запросом.
+        if post.author_id != request.user.pk:
             return redirect('blog:post_detail', id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -87,7 +137,8 @@ class EditPostView(LoginRequiredMixin, PostMixin, UpdateView):
     form_class = PostForm
 
     def get_success_url(self):
-        return reverse_lazy('blog:profile', args=[self.object.author])
+        # автор поста — текущий пользователь, это проверено в dispatch.
+        return reverse_lazy('blog:profile', args=[self.request.user.username])
 
 
 class DeletePostView(LoginRequiredMixin, PostMixin, DeleteView):
@@ -104,7 +155,9 @@ class CreateCommentsView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, id=self.kwargs['post_id'])
-        return super().form_valid(form)
+        # комментарий и счётчик комментариев поста сохраняются вместе.
+        with transaction.atomic():
+            return super().form_valid(form)
 
     def get_success_url(self):
         return reverse_lazy('blog:post_detail', args=[self.object.post_id])
@@ -120,7 +173,7 @@ class CommentsMixin:
     def dispatch(self, request, *args, **kwargs):
         comment = get_object_or_404(Comments, pk=kwargs['comment_id'],
                                     post=kwargs['post_id'])
-        if comment.author != request.user:
+        if comment.author_id != request.user.pk:
             return redirect('blog:post_detail', id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -143,6 +196,8 @@ class DeleteCommentsView(LoginRequiredMixin, CommentsMixin, DeleteView):
     pass
 
 
+@cache_anonymous_page('category:{category_slug}')
+@conditional_page(category_state)
 def category_posts(request, category_slug):
     """view-функция Категории постов."""
     category = get_object_or_404(
@@ -154,15 +209,10 @@ def category_posts(request, category_slug):
     post_list = category.posts.select_related(
         'author',
         'location',
-    ).filter(
-        is_published=True,
-        pub_date__lte=timezone.now(),
-    ).annotate(
-        comment_count=Count('comments',)
+    ).published(
+        feed_now()
     ).order_by('-pub_date',)
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_page_obj(request, post_list, PAGINATE_CONST)
     context = {
         'page_obj': page_obj,
         'category': category,
@@ -170,6 +220,8 @@ def category_posts(request, category_slug):
     return render(request, 'blog/category.html', context)
 
 
+@cache_anonymous_page('author:{username}')
+@conditional_page(profile_state)
 def profile(request, username):
     """view-функция профайла пользователя."""
     profile = get_object_or_404(User, username=username)
@@ -179,19 +231,12 @@ def profile(request, username):
         'category',
     ).filter(
         author=profile.id,
-    ).annotate(
-        comment_count=Count('comments',)
     ).order_by('-pub_date',)
     if username == request.user.username:
         post_list = post
     else:
-        post_list = post.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-        )
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        post_list = post.published(feed_now())
+    page_obj = get_page_obj(request, post_list, PAGINATE_CONST)
     context = {
         'profile': profile,
         'page_obj': page_obj,
@@ -199,6 +244,52 @@ def profile(request, username):
     return render(request, 'blog/profile.html', context)
 
 
+def search(request):
+    """view-функция полнотекстового поиска по публикациям."""
+    query = request.GET.get('q', '').strip()
+    results, next_cursor = [], None
+    if query:
+        results, next_cursor = search_posts(
+            query, request.GET.get('after'), PAGINATE_CONST
+        )
+    context = {
+        'query': query,
+        'results': results,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'blog/search.html', context)
+
+
+@require_safe
+def resized_image(request, width, name):
+    """view-функция ресайза картинки поста до разрешённой ширины.
+
+    Готовые варианты берутся из дискового кеша; WebP отдаётся, если его
+    принимает браузер. Оригиналы не перезаписываются (хранилище даёт
+    новое имя), поэтому ответ можно кешировать навсегда.
+    """
+    if width not in settings.BLOG_IMAGE_RESIZE_WIDTHS:
+        raise Http404
+    webp = 'image/webp' in request.headers.get('Accept', '')
+    resized = images.open_resized(name, width, webp)
+    if resized is None:
+        if not Post.objects.filter(image=name).exists():
+            raise Http404
+        try:
+            images.save_resized(name, width, webp)
+        except (OSError, UnidentifiedImageError,
+                Image.DecompressionBombError, SuspiciousFileOperation):
+            raise Http404
+        resized = images.open_resized(name, width, webp)
+        if resized is None:
+            raise Http404
+    file, content_type = resized
+    response = FileResponse(file, content_type=content_type)
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
 class EditProfile(LoginRequiredMixin, UpdateView):
     """CBV-функция изменения профайла пользователя."""
     model = User
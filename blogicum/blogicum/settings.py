@@ -21,16 +21,24 @@ INSTALLED_APPS = [
     'django_bootstrap5',  # добавляем приложение бутстрап для верстки HTML.
     'blog.apps.BlogConfig',  # добавляем приложение блог (основное приложение).
     'pages.apps.PagesConfig',  # добавляем приложение пейджес (приложение статичных страниц).
+    'jobs.apps.JobsConfig',  # очередь фоновых задач (python manage.py runworker).
+    'monitoring.apps.MonitoringConfig',  # замеры производительности запросов.
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.middleware.SlowQueryMiddleware',
+    'monitoring.middleware.ServerTimingMiddleware',
+    'monitoring.middleware.NPlusOneMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
 ]
 
 # обозначаем диррикторию для статичных файлов.
@@ -44,7 +52,9 @@ ROOT_URLCONF = 'blogicum.urls'
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, засекающий время рендера для мониторинга.
+        'BACKEND': 'monitoring.template_backend.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -64,6 +74,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # сайт и воркер фоновых задач пишут в одну базу: ждём снятия
+        # блокировки дольше стандартных 5 секунд.
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
@@ -104,6 +119,123 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 MEDIA_ROOT = BASE_DIR / 'media/post_images/'
 MEDIA_URL = '/media/'
 
+# Кеш проекта. Он должен быть общим для всех процессов: воркер фоновых
+# задач и планировщик публикаций прогревают и сбрасывают тот же кеш, что
+# читают веб-процессы. Файловый кеш общий для процессов одной машины; для
+# нескольких машин нужен memcached или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Длина корзины времени для лент, в секундах: «сейчас» округляется вниз до
+# начала корзины, и одинаковые запросы лент внутри неё берутся из кеша.
+BLOG_FEED_CACHE_BUCKET = 30
+
+# Время жизни страниц ленты, категорий, профилей и постов в кеше для
+# анонимных пользователей, в секундах. Правки контента сбрасывают кеш
+# затронутых страниц сразу.
+BLOG_PAGE_CACHE_TIMEOUT = 60
+
+# Режим пагинации лент: 'pages' (номера страниц) или 'cursor' (по ключу
+# pub_date/id, без COUNT(*) и OFFSET).
+BLOG_PAGINATION_MODE = 'pages'
+
+# Подсчёт публикаций для пагинации: 'exact' — точный COUNT, кешируемый на
+# BLOG_PAGINATOR_COUNT_TIMEOUT секунд; 'estimated' — подсчёт не дальше
+# BLOG_PAGINATOR_COUNT_LIMIT строк для очень больших таблиц.
+BLOG_PAGINATOR_COUNT_MODE = 'exact'
+BLOG_PAGINATOR_COUNT_TIMEOUT = 60
+BLOG_PAGINATOR_COUNT_LIMIT = 10000
+
+# Ширины уменьшенных копий картинок постов, в пикселях. Копии сохраняются
+# рядом с оригиналом при сохранении поста и попадают в srcset карточек.
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+
+# Ширины, до которых /media/resized/<ширина>/<файл> ужимает картинки постов
+# по запросу, и предельный размер дискового кеша таких ресайзов в байтах:
+# при превышении удаляются самые давно отданные варианты.
+BLOG_IMAGE_RESIZE_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+BLOG_IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Планировщик отложенных публикаций (manage.py runscheduler): окно в
+# секундах, в котором он держит ближайшие даты публикации, и как часто
+# перечитывает это окно из базы.
+BLOG_SCHEDULER_WINDOW = 300
+BLOG_SCHEDULER_POLL = 60
+
+# Очередь фоновых задач (приложение jobs): пауза между опросами пустой
+# очереди, через сколько секунд задача упавшего воркера снова доступна,
+# и пауза перед повтором, растущая вдвое с каждой попыткой, в секундах.
+JOBS_POLL_INTERVAL = 1
+JOBS_LOCK_TIMEOUT = 600
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+
+# Мониторинг: доля замеряемых запросов (от 0 до 1), она же по именам
+# представлений, например {'blog:profile': 1.0}, и отдавать ли замер
+# клиенту в заголовке Server-Timing.
+MONITORING_SAMPLE_RATE = 1.0
+MONITORING_SAMPLE_RATES = {}
+MONITORING_SERVER_TIMING_HEADER = True
+
+# Поиск N+1 (при DEBUG): сколько раз запрос одной формы (SQL без значений
+# параметров) может выполниться за один HTTP-запрос, исключения — имена
+# представлений или фрагменты SQL, и поднимать ли ошибку вместо записи в
+# лог (включается в тестах).
+MONITORING_NPLUSONE_THRESHOLD = 3
+MONITORING_NPLUSONE_ALLOWLIST = []
+MONITORING_NPLUSONE_RAISE = False
+
+# Журнал медленных запросов: порог в миллисекундах (None — выключен) и
+# префиксы имён представлений, запросы которых попадают в журнал. Сам
+# журнал — ротируемый JSON Lines, см. LOGGING.
+MONITORING_SLOW_QUERY_MS = 100
+MONITORING_SLOW_QUERY_VIEWS = ('blog:',)
+
+# Метрики /metrics: токен для заголовка Authorization: Bearer (None —
+# без проверки) и общий каталог, через который складываются счётчики
+# нескольких процессов-воркеров (None — только свой процесс), с паузой
+# между сохранениями счётчиков процесса в секундах.
+MONITORING_METRICS_TOKEN = None
+MONITORING_METRICS_DIR = None
+MONITORING_METRICS_FLUSH_INTERVAL = 5
+
+# Профилирование одного запроса по токену сотрудника (manage.py
+# profile_token): включено ли вообще, куда класть .prof, .alloc.txt и
+# .collapsed, срок жизни токена в секундах, сколько мест выделения памяти
+# показывать и период снятия стеков для flamegraph в секундах.
+MONITORING_PROFILING = False
+MONITORING_PROFILE_DIR = BASE_DIR / 'profiles'
+MONITORING_PROFILE_TOKEN_MAX_AGE = 600
+MONITORING_PROFILE_TOP_ALLOCATIONS = 25
+MONITORING_PROFILE_SAMPLE_INTERVAL = 0.001
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'monitoring.logs.JsonLinesFileHandler',
+            'filename': BASE_DIR / 'logs' / 'slow_queries.jsonl',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+        },
+    },
+    'loggers': {
+        'monitoring.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # Указываем адрес для редиректа после авторизации
 LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
@@ -5,6 +5,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from monitoring.views import metrics
+
 
 # хендлер шаьлона ошибки 404.
 handler404 = 'pages.views.page_not_found'
@@ -17,6 +19,7 @@ urlpatterns = [
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
     path('auth/', include('django.contrib.auth.urls')),
+    path('metrics', metrics, name='metrics'),
     path(
         'auth/registration/',
         CreateView.as_view(
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Класс для настройки админ-зоны модели Job"""
+    list_display = (
+        'task',
+        'status',
+        'attempts',
+        'max_attempts',
+        'run_at',
+        'locked_by',
+        'created_at',
+    )
+    list_filter = ('status', 'task')
+    actions = ('retry',)
+
+    @admin.action(description='Повторить выбранные задачи')
+    def retry(self, request, queryset):
+        queryset.update(
+            status=Job.Status.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            locked_by='',
+            locked_at=None,
+        )
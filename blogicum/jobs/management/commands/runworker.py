@@ -0,0 +1,40 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Сколько задач выполнять одновременно (потоков).',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Выйти, когда в очереди не останется готовых задач.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            burst=options['burst'],
+            poll_interval=options['poll_interval'],
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        processed = worker.run()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {processed}'
+        ))
@@ -0,0 +1,77 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """ОРМ модель: Фоновая задача в очереди"""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        FAILED = 'failed', 'Ошибка'
+
+    task = models.CharField(
+        max_length=200,
+        verbose_name='Задача',
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Позиционные аргументы',
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Именованные аргументы',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        verbose_name='Максимум попыток',
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Запустить не раньше',
+    )
+    locked_by = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Воркер',
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_at', 'id')
+        # индекс под выборку следующей задачи воркером.
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'),
+                name='job_status_run_at_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
@@ -0,0 +1,36 @@
+from functools import wraps
+
+from jobs.models import Job
+
+# Зарегистрированные задачи по полному имени функции.
+registry = {}
+
+
+def task(func=None, *, max_attempts=5):
+    """Регистрирует функцию как фоновую задачу.
+
+    Функцию по-прежнему можно вызвать напрямую, а func.delay(...) ставит
+    вызов в очередь и сразу возвращает созданную задачу. Аргументы
+    должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        registry[name] = func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return func(*args, **kwargs)
+
+        def delay(*args, **kwargs):
+            return Job.objects.create(
+                task=name,
+                args=list(args),
+                kwargs=kwargs,
+                max_attempts=max_attempts,
+            )
+
+        wrapper.delay = delay
+        wrapper.task_name = name
+        return wrapper
+
+    return decorator(func) if func else decorator
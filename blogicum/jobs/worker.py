@@ -0,0 +1,177 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.tasks import registry
+
+logger = logging.getLogger(__name__)
+
+# Сколько кандидатов перебрать, если задачу перехватил другой воркер.
+CLAIM_CANDIDATES = 5
+
+# Сколько раз повторять служебный запрос к очереди, если таблица занята.
+LOCKED_RETRIES = 10
+
+
+def _retry_locked(func, *args, **kwargs):
+    """Вызывает func, повторяя его, пока SQLite сообщает о блокировке.
+
+    В режиме общего кеша SQLite (так устроена тестовая база в памяти)
+    конкурентная запись сразу падает с «table is locked», не дожидаясь
+    timeout соединения.
+    """
+    for attempt in range(LOCKED_RETRIES):
+        try:
+            return func(*args, **kwargs)
+        except OperationalError as error:
+            if 'locked' not in str(error) or attempt + 1 == LOCKED_RETRIES:
+                raise
+            time.sleep(0.01 * (attempt + 1))
+
+
+def _claimable(now):
+    """Задачи, которые можно взять: очередные и зависшие у упавших воркеров."""
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return Job.objects.filter(
+        Q(status=Job.Status.QUEUED, run_at__lte=now)
+        | Q(status=Job.Status.RUNNING, locked_at__lt=stale)
+    )
+
+
+def claim(worker_id):
+    """Берёт следующую задачу в работу или возвращает None.
+
+    Задача захватывается одним атомарным UPDATE с проверкой числа
+    попыток, прочитанного вместе с кандидатом: если другой воркер успел
+    раньше, UPDATE не затронет строк. Блокировки строк не нужны, поэтому
+    это работает и на SQLite.
+    """
+    now = timezone.now()
+    candidates = _claimable(now).values_list('pk', 'attempts')
+    for pk, attempts in candidates[:CLAIM_CANDIDATES]:
+        claimed = _claimable(now).filter(pk=pk, attempts=attempts).update(
+            status=Job.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            locked_by=worker_id,
+            locked_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _resolve(name):
+    if name not in registry:
+        # задачи регистрируются при импорте своего модуля.
+        import_module(name.rpartition('.')[0])
+    return registry[name]
+
+
+def backoff(attempts):
+    """Пауза перед повтором: растёт вдвое с каждой попыткой, с разбросом."""
+    delay = min(
+        settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_BACKOFF_MAX,
+    )
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def execute(job):
+    """Выполняет задачу: удаляет её при успехе, иначе планирует повтор."""
+    try:
+        _resolve(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Задача %s упала (попытка %s)', job, job.attempts)
+        if job.attempts < job.max_attempts:
+            _retry_locked(
+                Job.objects.filter(pk=job.pk).update,
+                status=Job.Status.QUEUED,
+                run_at=timezone.now() + backoff(job.attempts),
+                locked_by='',
+                locked_at=None,
+                last_error=error,
+            )
+        else:
+            _retry_locked(
+                Job.objects.filter(pk=job.pk).update,
+                status=Job.Status.FAILED,
+                locked_by='',
+                locked_at=None,
+                last_error=error,
+            )
+        return False
+    _retry_locked(Job.objects.filter(pk=job.pk).delete)
+    return True
+
+
+class Worker:
+    """Выполняет задачи из очереди в concurrency потоках."""
+
+    def __init__(self, concurrency=1, burst=False, poll_interval=None):
+        self.concurrency = concurrency
+        self.burst = burst
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        self.stopping = threading.Event()
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._id = f'{socket.gethostname()}:{os.getpid()}'
+
+    def stop(self):
+        """Просит потоки закончить текущие задачи и выйти."""
+        self.stopping.set()
+
+    def _loop(self):
+        worker_id = f'{self._id}:{threading.current_thread().name}'
+        while not self.stopping.is_set():
+            if not self.burst:
+                # долгоживущему воркеру нужно переоткрывать соединения,
+                # как это делает Django между запросами.
+                close_old_connections()
+            job = _retry_locked(claim, worker_id)
+            if job is None:
+                if self.burst:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            execute(job)
+            with self._lock:
+                self.processed += 1
+
+    def _thread_loop(self):
+        try:
+            self._loop()
+        finally:
+            connection.close()
+
+    def run(self):
+        """Работает до stop(), а в режиме burst — пока очередь не опустеет.
+
+        Один поток выполняет задачи прямо в текущем, на том же соединении
+        с базой, что удобно в тестах.
+        """
+        if self.concurrency == 1:
+            self._loop()
+            return self.processed
+        threads = [
+            threading.Thread(
+                target=self._thread_loop, name=f'worker-{number}')
+            for number in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.processed
@@ -0,0 +1,33 @@
+import json
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна запись лога — одна строка JSON.
+
+    Словарь из сообщения записи выводится как есть, остальные сообщения —
+    как {'message': ...}; время записи добавляется в поле time.
+    """
+
+    def format(self, record):
+        entry = dict(record.msg) if isinstance(record.msg, dict) else {
+            'message': record.getMessage(),
+        }
+        entry.setdefault('time', self.formatTime(record))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class JsonLinesFileHandler(RotatingFileHandler):
+    """Ротируемый файл JSON Lines; каталог создаётся при первой записи."""
+
+    def __init__(self, filename, **kwargs):
+        kwargs.setdefault('encoding', 'utf-8')
+        kwargs.setdefault('delay', True)
+        super().__init__(filename, **kwargs)
+        self.setFormatter(JsonLinesFormatter())
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.profiling import TOKEN_PARAM, make_token
+
+
+class Command(BaseCommand):
+    help = ('Выдаёт сотруднику токен для профилирования одного запроса '
+            '(заголовок X-Profile-Token или параметр _profile).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        if not user.is_staff:
+            raise CommandError('Профилировать запросы могут только '
+                               'сотрудники.')
+        if not settings.MONITORING_PROFILING:
+            self.stderr.write(self.style.WARNING(
+                'MONITORING_PROFILING выключен: токен не сработает, пока '
+                'его не включить.'
+            ))
+        token = make_token(user)
+        self.stdout.write(token)
+        self.stdout.write(
+            f'Действует {settings.MONITORING_PROFILE_TOKEN_MAX_AGE} с. '
+            f'Пример: ?{TOKEN_PARAM}={token}'
+        )
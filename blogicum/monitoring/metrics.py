@@ -0,0 +1,199 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+# Границы корзин гистограммы времени ответа, в секундах.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Тип и описание каждой метрики для вывода в формате Prometheus.
+METRICS = {
+    'blog_http_requests_total': (
+        'counter', 'HTTP-запросы по имени URL, методу и статусу.'),
+    'blog_http_request_duration_seconds': (
+        'histogram', 'Время ответа по имени URL.'),
+    'blog_sampled_requests_total': (
+        'counter', 'Замеренные запросы (MONITORING_SAMPLE_RATE).'),
+    'blog_db_queries_total': (
+        'counter', 'Запросы к базе в замеренных запросах.'),
+    'blog_db_query_seconds_total': (
+        'counter', 'Время запросов к базе в замеренных запросах.'),
+    'blog_template_render_seconds_total': (
+        'counter', 'Время рендера шаблонов в замеренных запросах.'),
+    'blog_cache_lookups_total': (
+        'counter', 'Обращения к кешу по виду кеша и результату.'),
+    'blog_cache_hit_ratio': (
+        'gauge', 'Доля попаданий в кеш по виду кеша.'),
+}
+
+# У каждого потока свой словарь счётчиков: запись в него не требует
+# блокировок, а при сборе словари всех потоков складываются.
+_local = threading.local()
+_thread_counters = []
+_last_flush = 0.0
+
+
+def _counters():
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = {}
+        _thread_counters.append(counters)
+    return counters
+
+
+def inc(name, labels=(), value=1):
+    """Увеличивает счётчик name с метками labels — кортежем пар."""
+    counters = _counters()
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name, labels, value, buckets=LATENCY_BUCKETS):
+    """Добавляет значение в гистограмму name."""
+    index = bisect_left(buckets, value)
+    le = str(buckets[index]) if index < len(buckets) else '+Inf'
+    inc(f'{name}_bucket', labels + (('le', le),))
+    inc(f'{name}_sum', labels, value)
+    inc(f'{name}_count', labels)
+
+
+def record_cache_lookup(cache_name, hit):
+    """Учитывает обращение к кешу cache_name: попадание или промах."""
+    inc('blog_cache_lookups_total', (
+        ('cache', cache_name), ('result', 'hit' if hit else 'miss'),
+    ))
+
+
+def snapshot():
+    """Сумма счётчиков всех потоков процесса."""
+    totals = {}
+    for counters in list(_thread_counters):
+        # copy() словаря атомарна под GIL, в отличие от обхода.
+        for key, value in counters.copy().items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def flush():
+    """Сохраняет счётчики процесса в MONITORING_METRICS_DIR."""
+    global _last_flush
+    _last_flush = time.monotonic()
+    directory = Path(settings.MONITORING_METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = [
+        [name, [list(pair) for pair in labels], value]
+        for (name, labels), value in snapshot().items()
+    ]
+    with tempfile.NamedTemporaryFile(
+            'w', dir=directory, suffix='.tmp', delete=False) as file:
+        json.dump(rows, file)
+    os.replace(file.name, directory / f'{os.getpid()}.json')
+
+
+def maybe_flush():
+    """Сохраняет счётчики, если с прошлого раза прошло достаточно времени."""
+    if settings.MONITORING_METRICS_DIR and (
+            time.monotonic() - _last_flush
+            >= settings.MONITORING_METRICS_FLUSH_INTERVAL):
+        flush()
+
+
+def collect():
+    """Счётчики для выдачи: процесса или всех процессов из общего каталога.
+
+    Каждый процесс периодически пишет свои счётчики в файл <pid>.json,
+    сбор складывает все файлы. Файлы завершившихся процессов остаются,
+    поэтому счётчики не убывают.
+    """
+    if not settings.MONITORING_METRICS_DIR:
+        return snapshot()
+    flush()
+    totals = {}
+    for path in Path(settings.MONITORING_METRICS_DIR).glob('*.json'):
+        try:
+            rows = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in rows:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace(
+        '\n', r'\n').replace('"', r'\"')
+
+
+def _sample(name, labels, value):
+    if labels:
+        pairs = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+        name = f'{name}{{{pairs}}}'
+    return f'{name} {value}'
+
+
+def _histograms(totals, name):
+    """Строки гистограммы name с накопительными корзинами, как в Prometheus."""
+    buckets = {}
+    for (metric, labels), value in totals.items():
+        if metric == f'{name}_bucket':
+            series = tuple(pair for pair in labels if pair[0] != 'le')
+            le = dict(labels)['le']
+            buckets.setdefault(series, {})[le] = value
+    lines = []
+    for series in sorted(buckets):
+        cumulative = 0
+        for bound in [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']:
+            cumulative += buckets[series].get(bound, 0)
+            lines.append(_sample(
+                f'{name}_bucket', series + (('le', bound),), cumulative
+            ))
+        lines.append(_sample(
+            f'{name}_sum', series, totals.get((f'{name}_sum', series), 0)
+        ))
+        lines.append(_sample(
+            f'{name}_count', series, totals.get((f'{name}_count', series), 0)
+        ))
+    return lines
+
+
+def _hit_ratios(totals):
+    lookups = {}
+    for (metric, labels), value in totals.items():
+        if metric == 'blog_cache_lookups_total':
+            labels = dict(labels)
+            hits, total = lookups.get(labels['cache'], (0, 0))
+            lookups[labels['cache']] = (
+                hits + (value if labels['result'] == 'hit' else 0),
+                total + value,
+            )
+    return [
+        _sample('blog_cache_hit_ratio', (('cache', name),), hits / total)
+        for name, (hits, total) in sorted(lookups.items())
+    ]
+
+
+def render(totals):
+    """Текст метрик в формате выдачи Prometheus (text/plain 0.0.4)."""
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        if kind == 'histogram':
+            samples = _histograms(totals, name)
+        elif kind == 'gauge':
+            samples = _hit_ratios(totals)
+        else:
+            samples = [
+                _sample(name, labels, value)
+                for (metric, labels), value in sorted(totals.items())
+                if metric == name
+            ]
+        if samples:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+    return '\n'.join(lines) + '\n'
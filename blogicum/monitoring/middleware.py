@@ -0,0 +1,202 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from monitoring import metrics
+from monitoring.nplusone import NPlusOneError, QueryShapes, describe
+from monitoring.profiling import TOKEN_PARAM, check_token, profile_view
+from monitoring.slowlog import SlowQueries, record
+from monitoring.timing import RequestTiming, sampled
+
+logger = logging.getLogger('monitoring.requests')
+nplusone_logger = logging.getLogger('monitoring.nplusone')
+
+
+class ServerTimingMiddleware:
+    """Замеряет запросы и отдаёт результат в заголовке Server-Timing.
+
+    Для попавших в выборку запросов (см. MONITORING_SAMPLE_RATE)
+    считаются время и число запросов к базе, время рендера шаблонов и
+    общее время от вызова представления до готового ответа. Результат
+    пишется в лог monitoring.requests одной строкой с полями в extra.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        timing = getattr(request, 'monitoring_timing', None)
+        if timing is None:
+            return response
+        total = timing.stop()
+        view_name = request.resolver_match.view_name
+        if settings.MONITORING_SERVER_TIMING_HEADER:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={timing.db_time * 1000:.1f};'
+                f'desc="{timing.queries} queries"',
+                f'template;dur={timing.template_time * 1000:.1f}',
+                f'view;dur={total * 1000:.1f}',
+            ))
+        logger.info(
+            '%s %s %s view=%.1fms db=%.1fms queries=%d template=%.1fms',
+            request.method, view_name, response.status_code,
+            total * 1000, timing.db_time * 1000, timing.queries,
+            timing.template_time * 1000,
+            extra={
+                'view_name': view_name,
+                'method': request.method,
+                'status': response.status_code,
+                'view_ms': round(total * 1000, 3),
+                'db_ms': round(timing.db_time * 1000, 3),
+                'queries': timing.queries,
+                'template_ms': round(timing.template_time * 1000, 3),
+            },
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if sampled(request.resolver_match.view_name):
+            request.monitoring_timing = RequestTiming()
+            request.monitoring_timing.start()
+
+
+class NPlusOneMiddleware:
+    """Ищет N+1: запросы одной формы, повторённые с разными параметрами.
+
+    Работает при DEBUG или MONITORING_NPLUSONE_RAISE, иначе отключается
+    целиком. Найденное пишется в лог monitoring.nplusone со стеком
+    шаблонов и кода, а с MONITORING_NPLUSONE_RAISE (так настроены тесты)
+    поднимается NPlusOneError.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.DEBUG or settings.MONITORING_NPLUSONE_RAISE):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        shapes = QueryShapes()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(shapes)
+                )
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_name = match.view_name if match else ''
+        repeated = shapes.repeated(
+            settings.MONITORING_NPLUSONE_THRESHOLD,
+            view_name,
+            settings.MONITORING_NPLUSONE_ALLOWLIST,
+        )
+        if repeated:
+            report = describe(repeated, view_name)
+            if settings.MONITORING_NPLUSONE_RAISE:
+                raise NPlusOneError(report)
+            nplusone_logger.warning(report)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Пишет в лог monitoring.slow_queries запросы дольше порога.
+
+    Порог — MONITORING_SLOW_QUERY_MS (None отключает middleware), учитываются
+    представления, имена которых начинаются с префиксов из
+    MONITORING_SLOW_QUERY_VIEWS. План выполнения запрашивается после
+    ответа, поэтому сам EXPLAIN не попадает в замеры других middleware,
+    если это middleware стоит перед ними.
+    """
+
+    def __init__(self, get_response):
+        if settings.MONITORING_SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.MONITORING_SLOW_QUERY_MS / 1000
+
+    def __call__(self, request):
+        recorders = [
+            SlowQueries(alias, self.threshold) for alias in connections
+        ]
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(
+                    connections[recorder.alias].execute_wrapper(recorder)
+                )
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match and match.view_name.startswith(
+                tuple(settings.MONITORING_SLOW_QUERY_VIEWS)):
+            for recorder in recorders:
+                record(recorder.queries, request)
+        return response
+
+
+class MetricsMiddleware:
+    """Считает метрики запросов для /metrics.
+
+    Число запросов и гистограмма времени ответа ведутся для всех запросов
+    по имени URL, а запросы к базе и время шаблонов — для замеренных
+    ServerTimingMiddleware вместе с числом таких запросов, чтобы
+    средние на запрос считались и при выборке меньше 100%.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        response = self.get_response(request)
+        duration = perf_counter() - started
+        match = request.resolver_match
+        view = (('view', match.view_name if match else 'unresolved'),)
+        metrics.inc('blog_http_requests_total', (
+            ('method', request.method),
+            ('status', str(response.status_code)),
+        ) + view)
+        metrics.observe('blog_http_request_duration_seconds', view, duration)
+        timing = getattr(request, 'monitoring_timing', None)
+        if timing is not None:
+            metrics.inc('blog_sampled_requests_total', view)
+            metrics.inc('blog_db_queries_total', view, timing.queries)
+            metrics.inc('blog_db_query_seconds_total', view, timing.db_time)
+            metrics.inc(
+                'blog_template_render_seconds_total', view,
+                timing.template_time,
+            )
+        metrics.maybe_flush()
+        return response
+
+
+class ProfilingMiddleware:
+    """Профилирует один запрос сотрудника по подписанному токену.
+
+    Токен (manage.py profile_token) передаётся в заголовке X-Profile-Token
+    или параметре _profile; имя сохранённых файлов возвращается в
+    заголовке X-Profile. Без MONITORING_PROFILING middleware отключается
+    целиком и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MONITORING_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        token = (request.headers.get('X-Profile-Token')
+                 or request.GET.get(TOKEN_PARAM))
+        if not token or not check_token(token, request.user):
+            return None
+        response, name = profile_view(
+            request, view_func, view_args, view_kwargs
+        )
+        if name is not None:
+            response['X-Profile'] = name
+        return response
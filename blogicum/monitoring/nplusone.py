@@ -0,0 +1,82 @@
+import traceback
+
+from django.conf import settings
+from django.template.base import Node
+
+from monitoring.sql import normalize_sql
+
+
+class NPlusOneError(Exception):
+    """Запрос одной формы повторился много раз за один HTTP-запрос (N+1)."""
+
+
+def _project_file(filename):
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in filename
+    )
+
+
+def query_stack():
+    """Стек, из которого выполняется запрос: код проекта и узлы шаблонов."""
+    lines = []
+    for frame, lineno in traceback.walk_stack(None):
+        node = frame.f_locals.get('self')
+        if frame.f_code.co_name == 'render_annotated' and isinstance(
+                node, Node) and node.origin is not None:
+            name = node.origin.template_name or node.origin.name
+            line = f'{name}:{node.token.lineno}'
+        elif _project_file(frame.f_code.co_filename):
+            line = (f'{frame.f_code.co_filename}:{lineno} '
+                    f'in {frame.f_code.co_name}')
+        else:
+            continue
+        # соседние узлы одной строки шаблона схлопываем.
+        if not lines or lines[-1] != line:
+            lines.append(line)
+    return lines[::-1]
+
+
+class QueryShapes:
+    """Считает выполненные запросы по формам; execute_wrapper соединения.
+
+    Для каждой формы хранится число запросов и, если capture_stacks,
+    стек первого повтора.
+    """
+
+    def __init__(self, capture_stacks=True):
+        self.capture_stacks = capture_stacks
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = self.shapes.setdefault(normalize_sql(sql), {
+            'count': 0, 'stack': None,
+        })
+        shape['count'] += 1
+        if self.capture_stacks and shape['count'] == 2:
+            shape['stack'] = query_stack()
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold, view_name='', allowlist=()):
+        """Формы, выполненные не меньше threshold раз.
+
+        Запись allowlist пропускает все формы представления, если
+        совпадает с его именем, или формы, в SQL которых она встречается.
+        """
+        if view_name in allowlist:
+            return []
+        return [
+            (sql, shape['count'], shape['stack'])
+            for sql, shape in self.shapes.items()
+            if shape['count'] >= threshold
+            and not any(entry in sql for entry in allowlist)
+        ]
+
+
+def describe(repeated, view_name):
+    """Текст отчёта о повторяющихся запросах."""
+    lines = [f'N+1 в {view_name or "запросе"}:']
+    for sql, count, stack in repeated:
+        lines.append(f'  {count} раз: {sql}')
+        lines.extend(f'    {frame}' for frame in stack or ())
+    return '\n'.join(lines)
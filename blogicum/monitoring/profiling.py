@@ -0,0 +1,144 @@
+import cProfile
+import os
+import sys
+import threading
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'monitoring.profiling'
+
+# Параметр GET, которым можно передать токен вместо заголовка
+# X-Profile-Token.
+TOKEN_PARAM = '_profile'
+
+# tracemalloc общий на процесс, поэтому профилируется один запрос за раз.
+_lock = threading.Lock()
+
+
+def make_token(user):
+    """Подписанный токен, включающий профилирование для user."""
+    return signing.dumps(user.pk, salt=TOKEN_SALT)
+
+
+def check_token(token, user):
+    """Токен подписан, не просрочен и выдан этому сотруднику."""
+    try:
+        pk = signing.loads(
+            token, salt=TOKEN_SALT,
+            max_age=settings.MONITORING_PROFILE_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return user.is_active and user.is_staff and user.pk == pk
+
+
+class StackSampler:
+    """Снимает стек потока thread_id раз в interval секунд.
+
+    Стеки копятся в формате collapsed stacks («a;b;c число»), который
+    понимают flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(
+                    f'{code.co_name} ({os.path.basename(code.co_filename)}'
+                    f':{code.co_firstlineno})'
+                )
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopping.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.items()
+        )
+
+
+def _allocations(snapshot, peak):
+    lines = [f'Пик памяти за запрос: {peak / 1024:.1f} КиБ', '']
+    for stat in snapshot.statistics('lineno')[
+            :settings.MONITORING_PROFILE_TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(
+            f'{stat.size / 1024:10.1f} КиБ {stat.count:8} блоков  '
+            f'{frame.filename}:{frame.lineno}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def profile_view(request, view_func, view_args, view_kwargs):
+    """Выполняет представление под cProfile, tracemalloc и сэмплером стеков.
+
+    Возвращает ответ (шаблонный ответ рендерится внутри замера) и общее
+    имя сохранённых файлов: .prof, .alloc.txt и .collapsed в
+    MONITORING_PROFILE_DIR. Если уже идёт другой замер, возвращает имя
+    None и просто выполняет представление.
+    """
+    if not _lock.acquire(blocking=False):
+        return view_func(request, *view_args, **view_kwargs), None
+    tracing = tracemalloc.is_tracing()
+    try:
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        with StackSampler(
+                threading.get_ident(),
+                settings.MONITORING_PROFILE_SAMPLE_INTERVAL) as sampler:
+            profiler.enable()
+            try:
+                response = view_func(request, *view_args, **view_kwargs)
+                if callable(getattr(response, 'render', None)):
+                    response.render()
+            finally:
+                profiler.disable()
+        # без выделений самого профилировщика.
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        _lock.release()
+
+    view_name = request.resolver_match.view_name.replace(':', '-')
+    name = (f'{datetime.now():%Y%m%d-%H%M%S}-{view_name}-'
+            f'{uuid.uuid4().hex[:8]}')
+    directory = Path(settings.MONITORING_PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(directory / f'{name}.prof')
+    (directory / f'{name}.alloc.txt').write_text(
+        _allocations(snapshot, peak), encoding='utf-8'
+    )
+    (directory / f'{name}.collapsed').write_text(
+        sampler.collapsed(), encoding='utf-8'
+    )
+    return response, name
@@ -0,0 +1,62 @@
+import logging
+from time import perf_counter
+
+from django.db import DatabaseError, connections
+
+from monitoring.sql import normalize_sql
+
+logger = logging.getLogger('monitoring.slow_queries')
+
+
+class SlowQueries:
+    """Запоминает запросы дольше threshold секунд; execute_wrapper."""
+
+    def __init__(self, alias, threshold):
+        self.alias = alias
+        self.threshold = threshold
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - started
+            if duration >= self.threshold:
+                self.queries.append((self.alias, sql, params, many, duration))
+
+
+def explain(alias, sql, params):
+    """План выполнения SELECT-запроса строками или None."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    connection = connections[alias]
+    sqlite = connection.vendor == 'sqlite'
+    prefix = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    # у SQLite описание шага — последняя колонка строки плана.
+    return [
+        row[-1] if sqlite else ' '.join(str(value) for value in row)
+        for row in rows
+    ]
+
+
+def record(slow_queries, request):
+    """Пишет медленные запросы в лог вместе с планами выполнения."""
+    match = request.resolver_match
+    for alias, sql, params, many, duration in slow_queries:
+        logger.warning({
+            'view_name': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'database': alias,
+            'duration_ms': round(duration * 1000, 3),
+            'sql': normalize_sql(sql),
+            'params': None if many else params,
+            'plan': None if many else explain(alias, sql, params),
+        })
@@ -0,0 +1,19 @@
+import re
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Форма запроса: SQL без значений параметров и литералов.
+
+    Запросы, отличающиеся только параметрами или длиной списка в IN (...),
+    получают одну и ту же форму.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
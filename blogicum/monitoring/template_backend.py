@@ -0,0 +1,32 @@
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import (
+    DjangoTemplates, Template, reraise,
+)
+
+from monitoring.timing import current
+
+
+class TimedTemplate(Template):
+    """Шаблон, рендер которого учитывается в замере текущего запроса."""
+
+    def render(self, context=None, request=None):
+        timing = current()
+        if timing is None:
+            return super().render(context, request)
+        with timing.template():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Движок шаблонов Django, засекающий время рендера."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,73 @@
+import random
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+# Замер текущего запроса; None, если запрос не попал в выборку.
+_current = ContextVar('monitoring_timing', default=None)
+
+
+def current():
+    """Замер запроса, который обрабатывается сейчас, или None."""
+    return _current.get()
+
+
+def sampled(view_name):
+    """Попадает ли запрос к view_name в выборку для замера.
+
+    Доля берётся из MONITORING_SAMPLE_RATES по имени представления, а для
+    остальных — из MONITORING_SAMPLE_RATE.
+    """
+    rate = settings.MONITORING_SAMPLE_RATES.get(
+        view_name, settings.MONITORING_SAMPLE_RATE
+    )
+    return rate >= 1 or random.random() < rate
+
+
+class RequestTiming:
+    """Время в базе, в шаблонах и общее время одного запроса."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.template_time = 0.0
+        self._template_depth = 0
+        self._stack = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        # обёртка connection.execute_wrapper: засекает каждый запрос.
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries += 1
+
+    @contextmanager
+    def template(self):
+        """Засекает рендер шаблона; вложенные рендеры не считаются дважды."""
+        self._template_depth += 1
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._template_depth -= 1
+            if not self._template_depth:
+                self.template_time += perf_counter() - started
+
+    def start(self):
+        """Подключает замер к соединениям с базой и к рендеру шаблонов."""
+        for alias in connections:
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(self)
+            )
+        self._stack.callback(_current.reset, _current.set(self))
+
+    def stop(self):
+        """Отключает замер и возвращает общее время в секундах."""
+        self._stack.close()
+        return perf_counter() - self.started
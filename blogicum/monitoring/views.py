@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from monitoring.metrics import collect, render
+
+
+@require_safe
+@never_cache
+def metrics(request):
+    """Метрики в формате Prometheus.
+
+    Если задан MONITORING_METRICS_TOKEN, нужен заголовок
+    Authorization: Bearer <токен>.
+    """
+    token = settings.MONITORING_METRICS_TOKEN
+    if token and not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
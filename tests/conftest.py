@@ -76,6 +76,48 @@ pytest_plugins = [
 ]
 
 
+@pytest.fixture(scope='session', autouse=True)
+def isolated_cache():
+    """Свой кеш на прогон: тесты не трогают кеш проекта и друг друга.
+
+    Воркер в тестах выполняет задачи в том же процессе, поэтому хватает
+    кеша в памяти; общий кеш проекта проверяется отдельно.
+    """
+    from django.test import override_settings
+    caches = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }}
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def run_jobs():
+    """Выполняет все готовые фоновые задачи, как runworker --burst."""
+    from jobs.worker import Worker
+
+    def run():
+        return Worker(burst=True).run()
+
+    return run
+
+
+@pytest.fixture(autouse=True)
+def raise_on_nplusone(settings):
+    """Повторяющиеся запросы (N+1) в представлениях роняют тест."""
+    settings.MONITORING_NPLUSONE_RAISE = True
+
+
 @pytest.fixture
 def mixer():
     return _mixer
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _changelist_queries(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [query['sql'] for query in ctx.captured_queries]
+
+
+@pytest.mark.parametrize('url', [
+    '/admin/blog/post/',
+    '/admin/blog/comments/',
+])
+def test_changelist_queries_do_not_grow_with_rows(
+        mixer, admin_client, published_category, published_location,
+        CommentModel, url):
+    def blend(n):
+        posts = mixer.cycle(n).blend(
+            'blog.Post', category=published_category,
+            location=published_location)
+        for post in posts:
+            mixer.blend(CommentModel, post=post)
+
+    blend(2)
+    few = _changelist_queries(admin_client, url)
+    blend(20)
+    many = _changelist_queries(admin_client, url)
+    assert len(few) == len(many), (
+        f'Убедитесь, что число запросов на странице {url} не зависит от '
+        'числа строк: связанные объекты нужно загружать в list_select_related.'
+    )
+    assert not [sql for sql in many if 'COUNT(' in sql.upper()], (
+        'Убедитесь, что список в админке не пересчитывает все строки '
+        'на каждом запросе.'
+    )
+
+
+def test_changelist_truncates_text(
+        mixer, admin_client, published_category):
+    mixer.blend(
+        'blog.Post', category=published_category, text='слово ' * 500)
+    content = admin_client.get('/admin/blog/post/').content.decode()
+    assert 'слово ' * 50 not in content, (
+        'Убедитесь, что в списке постов текст выводится сокращённым.')
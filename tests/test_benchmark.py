@@ -0,0 +1,59 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from blog.benchmark import compare, percentile, run_benchmark
+from blog.datagen import DataGenerator
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+
+
+def test_benchmark_report():
+    DataGenerator(
+        users=5, posts=30, categories=2, locations=5,
+    ).generate()
+    cache.set('blog:benchmark:live', 'значение', None)
+    report = run_benchmark(repeat=2)
+    assert cache.get('blog:benchmark:live') == 'значение', (
+        'Убедитесь, что замер очищает свой кеш, а не кеш проекта.'
+    )
+    assert set(report['results']) == {
+        'index', 'index_deep_page', 'post_detail', 'category_posts',
+        'profile',
+    }
+    for result in report['results'].values():
+        assert result['queries'] > 0
+        assert result['p50_ms'] <= result['p99_ms']
+    assert report['meta']['posts'] == 30
+
+
+def test_compare_reports_regressions():
+    baseline = {'results': {
+        'index': {'queries': 5, 'p95_ms': 40.0},
+        'profile': {'queries': 6, 'p95_ms': 10.0},
+    }}
+    report = {'results': {
+        'index': {'queries': 5, 'p95_ms': 52.0},
+        'profile': {'queries': 7, 'p95_ms': 30.0},
+    }}
+    regressions = compare(report, baseline, tolerance=0.25, slack_ms=5)
+    assert len(regressions) == 2, (
+        'Убедитесь, что рост числа запросов и p95 сверх допуска '
+        'считается регрессией.'
+    )
+    assert all(line.startswith('profile') for line in regressions)
+
+
+def test_missing_baseline_is_an_error(tmp_path):
+    with pytest.raises(CommandError, match='--save-baseline'):
+        call_command(
+            'benchmark_views', '--baseline', str(tmp_path / 'нет.json'))
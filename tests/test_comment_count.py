@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location, CommentModel):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(CommentModel, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что счётчик комментариев поста увеличивается '
+        'при создании комментария.'
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что счётчик комментариев поста уменьшается '
+        'при удалении комментария.'
+    )
+
+    another_post = mixer.blend('blog.Post')
+    comments[1].post = another_post
+    comments[1].save()
+    post.refresh_from_db()
+    another_post.refresh_from_db()
+    assert (post.comment_count, another_post.comment_count) == (1, 1), (
+        'Убедитесь, что при переносе комментария в другой пост '
+        'счётчики обоих постов пересчитываются.'
+    )
+
+
+def test_recount_comments_repairs_drift(
+        mixer, post_with_published_location, CommentModel, PostModel):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post)
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command('recount_comments', stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что команда `recount_comments` восстанавливает '
+        'счётчики комментариев.'
+    )
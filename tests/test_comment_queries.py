@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _n_detail_queries(client, post):
+    url = f'/posts/{post.id}/'
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_detail_query_count_does_not_grow_with_comments(
+        mixer, user_client, published_category, published_location,
+        CommentModel):
+    few, many = mixer.cycle(2).blend(
+        'blog.Post', is_published=True, category=published_category,
+        location=published_location)
+    mixer.cycle(2).blend(CommentModel, post=few)
+    mixer.cycle(30).blend(CommentModel, post=many)
+
+    assert _n_detail_queries(user_client, few) == _n_detail_queries(
+        user_client, many), (
+        'Убедитесь, что число запросов к базе на странице публикации '
+        'не зависит от числа комментариев: авторов комментариев нужно '
+        'загружать вместе с комментариями.'
+    )
+
+
+def test_earlier_comments_are_loaded_by_fragment(
+        mixer, user_client, post_with_published_location,
+        CommentModel):
+    from blog import views
+    per_page = views.COMMENTS_PAGINATE_CONST
+    comments = mixer.cycle(per_page + 5).blend(
+        CommentModel, post=post_with_published_location)
+
+    response = user_client.get(f'/posts/{post_with_published_location.id}/')
+    shown = list(response.context['comments'])
+    assert shown == comments[-per_page:], (
+        'Убедитесь, что на странице публикации показывается последняя '
+        'страница комментариев «от старых к новым».'
+    )
+
+    cursor = response.context['earlier_cursor']
+    response = user_client.get(
+        f'/posts/{post_with_published_location.id}/comments/'
+        f'?before={cursor}')
+    assert response.status_code == 200
+    assert list(response.context['comments']) == comments[:5]
+    assert response.context['earlier_cursor'] is None
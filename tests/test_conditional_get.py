@@ -0,0 +1,94 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/posts/{post.id}/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+])
+def test_matching_etag_gets_not_modified(
+        user_client, user, published_category,
+        many_posts_with_published_locations, url_template):
+    post = many_posts_with_published_locations[0]
+    url = url_template.format(
+        post=post, category=published_category, user=user)
+    # первый ответ выставляет CSRF-cookie, которая входит в ETag.
+    user_client.get(url)
+    response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header('ETag') and response.has_header(
+        'Last-Modified'), (
+        f'Убедитесь, что страница {url} отдаёт заголовки ETag '
+        'и Last-Modified.'
+    )
+
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f'Убедитесь, что страница {url} отвечает 304 на If-None-Match '
+        'с актуальным ETag.'
+    )
+
+
+def test_new_comment_changes_detail_etag(
+        mixer, user_client, post_with_published_location, CommentModel):
+    url = f'/posts/{post_with_published_location.id}/'
+    user_client.get(url)
+    etag = user_client.get(url)['ETag']
+    mixer.blend(CommentModel, post=post_with_published_location)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что новый комментарий меняет ETag страницы публикации.'
+    )
+
+
+def test_edited_post_changes_feed_etag(
+        user_client, many_posts_with_published_locations):
+    etag = user_client.get('/')['ETag']
+    post = many_posts_with_published_locations[0]
+    post.title = 'Заголовок после правки'
+    post.save()
+    response = user_client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_deleted_comment_moves_feed_last_modified(
+        monkeypatch, mixer, user_client, post_with_published_location,
+        CommentModel):
+    comment = mixer.blend(CommentModel, post=post_with_published_location)
+    # посты страницы списка известны после первого рендера.
+    user_client.get('/')
+    last_modified = user_client.get('/')['Last-Modified']
+    later = timezone.now() + timedelta(seconds=2)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+    comment.delete()
+    response = user_client.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что удаление комментария сдвигает Last-Modified ленты.'
+    )
+
+
+def test_deferred_post_changes_feed_etag_without_scheduler(
+        monkeypatch, mixer, user_client, published_category,
+        published_location):
+    mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        location=published_location,
+        pub_date=timezone.now() + timedelta(seconds=60))
+    user_client.get('/')
+    etag = user_client.get('/')['ETag']
+    later = timezone.now() + timedelta(minutes=5)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+    response = user_client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что наступившая дата публикации меняет ETag ленты '
+        'и без планировщика.'
+    )
@@ -0,0 +1,82 @@
+import pytest
+
+from blog.paginators import CURSOR_NEXT, CURSOR_PREVIOUS, encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def cursor_mode(settings):
+    settings.BLOG_PAGINATION_MODE = 'cursor'
+
+
+def _walk_pages(client, url):
+    pages = []
+    response = client.get(url)
+    while True:
+        page_obj = response.context['page_obj']
+        pages.append(page_obj)
+        if not page_obj.has_next():
+            return pages
+        response = client.get(f'{url}?cursor={page_obj.next_cursor}')
+
+
+@pytest.mark.usefixtures('cursor_mode')
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+])
+def test_cursor_pages_cover_feed(
+        user_client, user, published_category,
+        many_posts_with_published_locations, url_template):
+    url = url_template.format(category=published_category, user=user)
+    pages = _walk_pages(user_client, url)
+    posts = [post for page in pages for post in page]
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.pk), reverse=True)
+    assert [post.pk for post in posts] == [post.pk for post in expected], (
+        'Убедитесь, что при курсорной пагинации публикации выводятся '
+        'без пропусков и повторов, «от новых к старым».'
+    )
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+
+    back = user_client.get(f'{url}?cursor={pages[-1].previous_cursor}')
+    assert [post.pk for post in back.context['page_obj']] == [
+        post.pk for post in pages[-2]], (
+        'Убедитесь, что курсор «назад» возвращает предыдущую страницу.'
+    )
+
+
+@pytest.mark.usefixtures('cursor_mode')
+def test_cursor_bad_token_falls_back_to_first_page(
+        user_client, many_posts_with_published_locations):
+    first = user_client.get('/').context['page_obj']
+    response = user_client.get('/?cursor=not-a-cursor')
+    assert response.status_code == 200
+    assert [post.pk for post in response.context['page_obj']] == [
+        post.pk for post in first]
+
+
+@pytest.mark.usefixtures('cursor_mode')
+@pytest.mark.parametrize('direction', [CURSOR_NEXT, CURSOR_PREVIOUS])
+def test_exhausted_cursor_gives_empty_page(
+        user_client, many_posts_with_published_locations, direction):
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.pk))
+    # курсор за последней публикацией в своём направлении.
+    edge = posts[0] if direction == CURSOR_NEXT else posts[-1]
+    response = user_client.get(
+        '/', {'cursor': encode_cursor(direction, edge)})
+    assert response.status_code == 200, (
+        'Убедитесь, что курсор за концом ленты не приводит к ошибке.'
+    )
+    page_obj = response.context['page_obj']
+    assert not list(page_obj)
+    assert page_obj.next_cursor is None
+    assert page_obj.previous_cursor is None
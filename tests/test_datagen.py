@@ -0,0 +1,80 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.datagen import DataGenerator, parse_distribution
+from blog.models import Category, Comments, Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+User = get_user_model()
+
+
+def _snapshot():
+    first_user = User.objects.order_by('pk').first().pk
+    return [
+        (title, author_id - first_user, comment_count)
+        for title, author_id, comment_count in Post.objects.order_by(
+            'pk').values_list('title', 'author_id', 'comment_count')
+    ]
+
+
+def test_parse_distribution():
+    assert parse_distribution('3')(None) == 3
+    assert parse_distribution('fixed:0')(None) == 0
+    with pytest.raises(ValueError):
+        parse_distribution('normal:2')
+    with pytest.raises(ValueError):
+        parse_distribution('poisson:много')
+
+
+def test_generated_data_is_skewed_and_consistent():
+    now = timezone.now()
+    DataGenerator(
+        users=50, posts=600, comments_per_post='pareto:1.2',
+        categories=20, seed=1, batch_size=100, now=now,
+    ).generate()
+    assert Post.objects.count() == 600
+    assert not Post.objects.annotate(
+        total=Count('comments')).exclude(total=F('comment_count')).exists(), (
+        'Убедитесь, что comment_count совпадает с числом комментариев.'
+    )
+    authors = list(User.objects.annotate(
+        total=Count('posts')).order_by('-total').values_list(
+        'total', flat=True))
+    assert authors[0] > 5 * authors[len(authors) // 2], (
+        'Убедитесь, что у популярных авторов намного больше постов.'
+    )
+    assert Post.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(pub_date__gt=now).exists()
+    assert Category.objects.filter(is_published=False).exists()
+    assert not Comments.objects.filter(
+        post__pub_date__gt=now).exists(), (
+        'Убедитесь, что у отложенных постов нет комментариев.'
+    )
+
+
+def test_same_seed_gives_same_data():
+    now = timezone.now()
+    DataGenerator(users=10, posts=50, seed=7, now=now).generate()
+    first = _snapshot()
+    Post.objects.all().delete()
+    User.objects.all().delete()
+    DataGenerator(users=10, posts=50, seed=7, now=now).generate()
+    assert _snapshot() == first
+
+
+def test_generate_blog_data_command():
+    out = StringIO()
+    call_command(
+        'generate_blog_data', users=5, posts=20, comments_per_post='2',
+        categories=3, locations=3, stdout=out,
+    )
+    assert Post.objects.count() == 20
+    assert 'blog.post: 20' in out.getvalue()
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _admin_export(client, url, action, ids):
+    return client.post(url, {
+        'action': action,
+        '_selected_action': ids,
+    })
+
+
+def test_admin_exports_posts_as_streamed_csv(
+        admin_client, many_posts_with_published_locations):
+    posts = many_posts_with_published_locations
+    response = _admin_export(
+        admin_client, '/admin/blog/post/', 'export_csv',
+        [post.pk for post in posts])
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Убедитесь, что выгрузка отдаётся через StreamingHttpResponse.')
+    with CaptureQueriesContext(connection) as ctx:
+        content = b''.join(response.streaming_content).decode()
+    assert len(ctx.captured_queries) == 1, (
+        'Убедитесь, что авторы, категории и локации выгружаются '
+        'вместе с постами, без запроса на каждую строку.'
+    )
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [int(row['id']) for row in rows] == sorted(
+        post.pk for post in posts)
+    assert rows[0]['author'] == posts[0].author.username
+
+
+def test_admin_exports_comments_as_jsonl(
+        mixer, admin_client, post_with_published_location, CommentModel):
+    comments = mixer.cycle(3).blend(
+        CommentModel, post=post_with_published_location)
+    response = _admin_export(
+        admin_client, '/admin/blog/comments/', 'export_jsonl',
+        [comment.pk for comment in comments])
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)['text'] for line in lines] == [
+        comment.text for comment in comments]
+
+
+def test_export_command(post_with_published_location):
+    out = StringIO()
+    call_command('export_content', 'posts', format='jsonl', stdout=out)
+    row = json.loads(out.getvalue())
+    assert row['title'] == post_with_published_location.title
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_feed_now_is_rounded_to_bucket(settings):
+    from blog.cache import feed_now
+    settings.BLOG_FEED_CACHE_BUCKET = 30
+    now = feed_now()
+    assert now.timestamp() % 30 == 0
+    assert timezone.now() - now < timedelta(seconds=30)
+
+
+def test_recent_post_appears_without_restart(
+        mixer, user_client, published_category):
+    post = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        pub_date=timezone.now() - timedelta(minutes=1))
+    response = user_client.get('/')
+    assert post in response.context['page_obj'], (
+        'Убедитесь, что время публикации для главной страницы '
+        'вычисляется при каждом запросе, а не при импорте модуля.'
+    )
+
+
+def test_feed_query_is_shared_within_bucket(
+        settings, user_client, many_posts_with_published_locations):
+    settings.BLOG_FEED_CACHE_BUCKET = 3600
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get('/')
+    feed_queries = [
+        query for query in ctx.captured_queries
+        if 'ORDER BY "blog_post"."pub_date" DESC' in query['sql']
+    ]
+    assert not feed_queries, (
+        'Убедитесь, что одинаковые запросы ленты в пределах одной '
+        'корзины времени берутся из кеша.'
+    )
+
+
+def test_feed_cache_invalidated_on_edit(
+        user_client, many_posts_with_published_locations):
+    post = user_client.get('/').context['page_obj'][0]
+    post.title = 'Заголовок после правки'
+    post.save()
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Заголовок после правки' in content, (
+        'Убедитесь, что кеш ленты сбрасывается при изменении публикации.'
+    )
+
+
+def test_post_card_cache_follows_category_and_location(
+        user_client, user, many_posts_with_published_locations):
+    url = f'/profile/{user.username}/'
+    post = user_client.get(url).context['page_obj'][0]
+    post.category.title = 'Категория после правки'
+    post.category.save()
+    post.location.name = 'Локация после правки'
+    post.location.save()
+    content = user_client.get(url).content.decode('utf-8')
+    assert 'Категория после правки' in content, (
+        'Убедитесь, что кеш карточки поста сбрасывается '
+        'при изменении категории.'
+    )
+    assert 'Локация после правки' in content, (
+        'Убедитесь, что кеш карточки поста сбрасывается '
+        'при изменении локации.'
+    )
@@ -0,0 +1,62 @@
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog import fixtures
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_iter_json_array_reads_in_chunks(monkeypatch):
+    monkeypatch.setattr(fixtures, 'READ_CHUNK', 7)
+    items = [{'model': 'blog.category', 'fields': {'title': 'а' * n}}
+             for n in range(20)]
+    stream = io.StringIO(json.dumps(items, indent=2))
+    assert list(fixtures.iter_json_array(stream)) == items
+
+
+def test_stream_loaddata_orders_models_and_keeps_dates(
+        tmp_path, user, PostModel, CommentModel):
+    created_at = '2020-01-02T03:04:05Z'
+    # посты и комментарии идут раньше категорий и локаций, на которые
+    # ссылаются.
+    dump = [
+        {'model': 'blog.comments', 'pk': 1, 'fields': {
+            'text': 'Комментарий', 'post': 1, 'author': user.pk,
+            'created_at': created_at}},
+    ] + [
+        {'model': 'blog.post', 'pk': pk, 'fields': {
+            'title': f'Загруженный пост {pk}', 'text': 'Текст',
+            'pub_date': created_at, 'created_at': created_at,
+            'is_published': True, 'author': user.pk, 'category': 1,
+            'location': 1}}
+        for pk in range(1, 6)
+    ] + [
+        {'model': 'blog.category', 'pk': 1, 'fields': {
+            'title': 'Категория', 'description': 'Описание', 'slug': 'cat',
+            'is_published': True, 'created_at': created_at}},
+        {'model': 'blog.location', 'pk': 1, 'fields': {
+            'name': 'Место', 'is_published': True,
+            'created_at': created_at}},
+    ]
+    path = tmp_path / 'dump.json'
+    path.write_text(json.dumps(dump), encoding='utf-8')
+
+    out = StringIO()
+    call_command('stream_loaddata', str(path), batch_size=2, stdout=out)
+    assert 'объектов/с' in out.getvalue(), (
+        'Убедитесь, что команда сообщает скорость загрузки.')
+    assert PostModel.objects.count() == 5
+    post = PostModel.objects.get(pk=1)
+    assert post.created_at.year == 2020, (
+        'Убедитесь, что даты из фикстуры не заменяются временем загрузки.')
+    assert post.comment_count == 1, (
+        'Убедитесь, что после загрузки пересчитываются счётчики '
+        'комментариев.'
+    )
+    assert CommentModel.objects.get(pk=1).post == post
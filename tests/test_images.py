@@ -0,0 +1,161 @@
+import os
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.tasks import process_post_image
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _jpeg(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+    return tmp_path
+
+
+def test_worker_saves_derivatives_and_srcset(
+        media_root, user_client, published_category, run_jobs):
+    response = user_client.post('/posts/create/', {
+        'title': 'С картинкой',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T10:00',
+        'category': published_category.pk,
+        'image': SimpleUploadedFile(
+            'photo.jpg', _jpeg(1000, 500), content_type='image/jpeg'),
+    })
+    assert response.status_code == 302
+    assert not list(media_root.glob('photo.w*.jpg')), (
+        'Убедитесь, что картинка обрабатывается в фоне, а не в запросе.'
+    )
+    assert run_jobs() == 1
+    widths = sorted(
+        Image.open(path).size for path in media_root.glob('photo.w*.jpg'))
+    assert widths == [(320, 160), (640, 320)], (
+        'Убедитесь, что при сохранении поста создаются уменьшенные копии '
+        'картинки, не шире оригинала.'
+    )
+
+    img = BeautifulSoup(
+        user_client.get('/').content, features='html.parser'
+    ).find('img', srcset=True)
+    assert img is not None, (
+        'Убедитесь, что картинки постов в ленте выводятся с srcset.')
+    assert img['srcset'] == (
+        '/media/photo.w320.jpg 320w, /media/photo.w640.jpg 640w, '
+        '/media/photo.jpg 1000w'
+    )
+    assert (img['width'], img['height'], img['loading']) == (
+        '1000', '500', 'lazy'), (
+        'Убедитесь, что карточка поста выводит размеры картинки '
+        'и ленивую загрузку.'
+    )
+    assert 'data:image/jpeg;base64,' in img['style']
+
+    # размеры берутся из базы, файл при рендере не нужен.
+    for path in media_root.glob('photo*.jpg'):
+        path.unlink()
+    cache.clear()
+    img = BeautifulSoup(
+        user_client.get('/').content, features='html.parser'
+    ).find('img', srcset=True)
+    assert img['width'] == '1000'
+
+
+def test_backfill_command(media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image.save('old.jpg', ContentFile(_jpeg(2000, 1000)))
+    call_command('make_image_derivatives', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_meta['width'] == 2000
+    assert {path.name for path in media_root.glob('old.w*.jpg')} == {
+        'old.w320.jpg', 'old.w640.jpg', 'old.w1280.jpg'}
+
+
+@pytest.fixture
+def post_with_image(media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image.save('big.jpg', ContentFile(_jpeg(2000, 1000)))
+    return post
+
+
+def _resize(client, width, accept='image/jpeg'):
+    return client.get(
+        f'/media/resized/{width}/big.jpg', HTTP_ACCEPT=accept)
+
+
+def test_resize_negotiates_webp_and_is_immutable(
+        settings, client, post_with_image):
+    response = _resize(client, 480, 'image/webp,image/*')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'image/webp'
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept' in response['Vary']
+    image = Image.open(BytesIO(b''.join(response.streaming_content)))
+    assert image.size == (480, 240)
+
+    response = _resize(client, 480)
+    assert response['Content-Type'] == 'image/jpeg', (
+        'Убедитесь, что без WebP в Accept картинка отдаётся в формате '
+        'оригинала.'
+    )
+    assert _resize(client, 481).status_code == 404, (
+        'Убедитесь, что ширина ресайза проверяется по списку разрешённых.'
+    )
+    assert client.get(
+        '/media/resized/480/missing.jpg').status_code == 404
+
+
+def test_resize_cache_evicts_least_recently_served(
+        client, media_root, post_with_image):
+    from blog.images import evict_resized
+    cache_dir = media_root / '_resized'
+    files = {}
+    for stamp, width in enumerate((160, 320, 480), start=1):
+        _resize(client, width)
+        files[width] = next(cache_dir.glob(f'*.w{width}.jpeg'))
+        os.utime(files[width], (stamp, stamp))
+    _resize(client, 160)
+
+    evict_resized(
+        files[160].stat().st_size + files[480].stat().st_size)
+    assert sorted(path.name for path in cache_dir.iterdir()) == sorted(
+        (files[160].name, files[480].name)), (
+        'Убедитесь, что из кеша ресайзов вытесняются самые давно '
+        'отданные варианты.'
+    )
+
+
+def test_worker_invalidates_pages_of_processed_image(
+        media_root, mixer, user_client, published_category, run_jobs):
+    post = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        location=None, pub_date='2020-01-01T10:00Z',
+        image=ContentFile(_jpeg(1000, 500), name='photo.jpg'))
+    url = f'/posts/{post.pk}/'
+    user_client.get(url)
+    etag = user_client.get(url)['ETag']
+    process_post_image.delay(post.pk)
+    assert run_jobs() == 1
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что обработка картинки в воркере сбрасывает ETag '
+        'страниц поста.'
+    )
+    assert BeautifulSoup(response.content, features='html.parser').find(
+        'img', srcset=True) is not None
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _feed_query_plans(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    feed_queries = [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "blog_post"' in query['sql']
+        and 'ORDER BY "blog_post"."pub_date" DESC' in query['sql']
+    ]
+    assert feed_queries, f'Не найден запрос ленты для {url}.'
+    plans = []
+    with connection.cursor() as cursor:
+        for sql in feed_queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append(' | '.join(row[-1] for row in cursor.fetchall()))
+    return plans
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite')
+@pytest.mark.parametrize(('url_template', 'index_name'), [
+    ('/', 'post_published_feed_idx'),
+    ('/category/{category.slug}/', 'post_category_feed_idx'),
+    ('/profile/{user.username}/', 'post_author_pub_date_idx'),
+])
+def test_feed_uses_index(
+        user_client, user, published_category,
+        many_posts_with_published_locations, url_template, index_name):
+    url = url_template.format(category=published_category, user=user)
+    for plan in _feed_query_plans(user_client, url):
+        assert index_name in plan, (
+            f'Убедитесь, что запрос ленты {url} использует индекс '
+            f'`{index_name}`. План запроса: {plan}'
+        )
+        assert 'SCAN blog_post' not in plan, (
+            f'Запрос ленты {url} полностью сканирует таблицу постов: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            f'Запрос ленты {url} сортирует посты без индекса: {plan}'
+        )
@@ -0,0 +1,82 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.tasks import task
+from jobs.worker import Worker, claim
+
+calls = []
+calls_lock = threading.Lock()
+
+
+@task
+def record(value):
+    with calls_lock:
+        calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('сбой')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+@pytest.mark.django_db
+def test_delay_enqueues_and_worker_runs(run_jobs):
+    record.delay('значение')
+    assert not calls, 'Убедитесь, что delay() только ставит задачу в очередь.'
+    assert run_jobs() == 1
+    assert calls == ['значение']
+    assert not Job.objects.exists(), (
+        'Убедитесь, что выполненные задачи удаляются из очереди.')
+
+
+@pytest.mark.django_db
+def test_failed_job_is_retried_with_backoff(settings, run_jobs):
+    settings.JOBS_RETRY_BACKOFF = 60
+    job = explode.delay()
+    run_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED
+    assert job.attempts == 1
+    assert job.run_at >= timezone.now() + timedelta(seconds=59), (
+        'Убедитесь, что упавшая задача повторяется с задержкой.')
+    assert 'RuntimeError' in job.last_error
+
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    run_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED, (
+        'Убедитесь, что после max_attempts попыток задача помечается '
+        'как упавшая.'
+    )
+
+
+@pytest.mark.django_db
+def test_job_is_claimed_once_and_stale_lock_expires(settings):
+    job = record.delay(1)
+    assert claim('первый') == job
+    assert claim('второй') is None, (
+        'Убедитесь, что задачу в работе не может взять другой воркер.')
+
+    Job.objects.filter(pk=job.pk).update(
+        locked_at=timezone.now()
+        - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT + 1))
+    reclaimed = claim('второй')
+    assert reclaimed == job and reclaimed.attempts == 2, (
+        'Убедитесь, что задачу упавшего воркера можно взять снова.')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_worker_runs_each_job_once():
+    for value in range(20):
+        record.delay(value)
+    assert Worker(concurrency=4, burst=True).run() == 20
+    assert sorted(calls) == list(range(20))
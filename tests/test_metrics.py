@@ -0,0 +1,84 @@
+import json
+import threading
+
+import pytest
+
+from monitoring import metrics
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+INDEX_REQUESTS = (
+    'blog_http_requests_total{method="GET",status="200",view="blog:index"}'
+)
+INDEX_COUNT = 'blog_http_request_duration_seconds_count{view="blog:index"}'
+
+
+def _scrape(client, **headers):
+    response = client.get('/metrics', **headers)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_count_requests_per_url_name(client):
+    before = _scrape(client)
+    client.get('/')
+    client.get('/')
+    after = _scrape(client)
+    assert after[INDEX_REQUESTS] - before.get(INDEX_REQUESTS, 0) == 2, (
+        'Убедитесь, что /metrics считает запросы по имени URL и статусу.'
+    )
+    assert after[INDEX_COUNT] - before.get(INDEX_COUNT, 0) == 2
+    buckets = [
+        value for name, value in after.items()
+        if name.startswith('blog_http_request_duration_seconds_bucket'
+                           '{view="blog:index"')
+    ]
+    assert buckets == sorted(buckets), (
+        'Убедитесь, что корзины гистограммы накопительные.'
+    )
+    assert buckets[-1] == after[INDEX_COUNT]
+    assert after['blog_db_queries_total{view="blog:index"}'] > 0
+    assert 'blog_template_render_seconds_total{view="blog:index"}' in after
+    # второй запрос анонимного пользователя берётся из страничного кеша.
+    assert 0 < after['blog_cache_hit_ratio{cache="page"}'] < 1
+
+
+def test_metrics_token(client, settings):
+    settings.MONITORING_METRICS_TOKEN = 'секрет'
+    assert client.get('/metrics').status_code == 403
+    _scrape(client, HTTP_AUTHORIZATION='Bearer секрет')
+
+
+def test_counters_from_threads_are_summed():
+    name = 'blog_test_threads_total'
+    thread = threading.Thread(target=metrics.inc, args=(name, (), 5))
+    thread.start()
+    thread.join()
+    metrics.inc(name, (), 2)
+    assert metrics.snapshot()[(name, ())] >= 7
+
+
+def test_metrics_are_merged_across_processes(client, settings, tmp_path):
+    settings.MONITORING_METRICS_DIR = str(tmp_path)
+    client.get('/')
+    (tmp_path / '999999.json').write_text(json.dumps([
+        ['blog_http_requests_total',
+         [['method', 'GET'], ['status', '200'], ['view', 'blog:index']],
+         40],
+    ]))
+    own = metrics.snapshot()[(
+        'blog_http_requests_total',
+        (('method', 'GET'), ('status', '200'), ('view', 'blog:index')),
+    )]
+    samples = _scrape(client)
+    assert samples[INDEX_REQUESTS] == own + 40, (
+        'Убедитесь, что счётчики процессов складываются через общий каталог.'
+    )
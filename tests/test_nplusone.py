@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.urls import path
+
+from blog.models import Post
+from monitoring.nplusone import NPlusOneError, QueryShapes
+from monitoring.sql import normalize_sql
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+AUTHORS_TEMPLATE = (
+    '{% for post in posts %}{{ post.author.username }}{% endfor %}'
+)
+
+
+def authors_view(request):
+    template = engines['django'].from_string(AUTHORS_TEMPLATE)
+    return HttpResponse(template.render({'posts': Post.objects.all()}))
+
+
+urlpatterns = [
+    path('authors/', authors_view, name='authors'),
+]
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        'SELECT * FROM "t1" WHERE "id" IN (%s, %s, %s) AND "x" = \'a\''
+    ) == normalize_sql(
+        'SELECT * FROM "t1"  WHERE "id" IN (%s) AND "x" = \'b\''
+    ) == 'SELECT * FROM "t1" WHERE "id" IN (...) AND "x" = ?'
+
+
+def test_query_shapes(many_posts_with_published_locations):
+    shapes = QueryShapes()
+    with connection.execute_wrapper(shapes):
+        for post in Post.objects.all():
+            post.author.username
+    (sql, count, _), = shapes.repeated(3)
+    assert 'auth_user' in sql
+    assert count == len(many_posts_with_published_locations)
+    assert shapes.repeated(3, allowlist=['"auth_user"']) == []
+
+
+@pytest.mark.urls('test_nplusone')
+def test_middleware_raises_on_nplusone(
+        client, settings, many_posts_with_published_locations):
+    with pytest.raises(NPlusOneError) as error:
+        client.get('/authors/')
+    assert 'authors' in str(error.value)
+    assert '<unknown source>:1' in str(error.value), (
+        'Убедитесь, что в отчёт попадает строка шаблона с запросом.'
+    )
+    settings.MONITORING_NPLUSONE_ALLOWLIST = ['authors']
+    assert client.get('/authors/').status_code == 200
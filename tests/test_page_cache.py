@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _n_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_anonymous_pages_are_cached(
+        unlogged_client, user, published_category,
+        many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    for url in ('/', f'/posts/{post.id}/',
+                f'/category/{published_category.slug}/',
+                f'/profile/{user.username}/'):
+        unlogged_client.get(url)
+        assert _n_queries(unlogged_client, url) == 0, (
+            f'Убедитесь, что страница {url} кешируется '
+            'для анонимных пользователей.'
+        )
+
+
+def test_logged_in_pages_are_not_cached(
+        user_client, many_posts_with_published_locations):
+    user_client.get('/')
+    assert _n_queries(user_client, '/') > 0
+
+
+def test_comment_purges_only_affected_pages(
+        mixer, unlogged_client, another_user, published_category,
+        many_posts_with_published_locations, CommentModel):
+    # самый новый пост виден на первых страницах ленты и категории.
+    commented, untouched = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: post.pub_date, reverse=True)[:2]
+    untouched.author = another_user
+    untouched.category = mixer.blend('blog.Category', is_published=True)
+    untouched.save()
+    urls = {
+        'commented': f'/posts/{commented.id}/',
+        'untouched': f'/posts/{untouched.id}/',
+        'untouched_profile': f'/profile/{another_user.username}/',
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+    }
+    for url in urls.values():
+        unlogged_client.get(url)
+
+    mixer.blend(CommentModel, post=commented)
+
+    assert _n_queries(unlogged_client, urls['commented']) > 0
+    assert _n_queries(unlogged_client, urls['index']) > 0
+    assert _n_queries(unlogged_client, urls['category']) > 0
+    assert _n_queries(unlogged_client, urls['untouched']) == 0, (
+        'Убедитесь, что новый комментарий не сбрасывает кеш '
+        'страниц других публикаций.'
+    )
+    assert _n_queries(unlogged_client, urls['untouched_profile']) == 0
+
+
+def test_comment_keeps_lists_without_the_post_cached(
+        settings, mixer, unlogged_client, user_client,
+        many_posts_with_published_locations, CommentModel):
+    settings.BLOG_FEED_CACHE_BUCKET = 3600
+    by_date = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: post.pub_date, reverse=True)
+    shown, hidden = by_date[0], by_date[-1]
+    unlogged_client.get('/')
+    user_client.get('/')
+
+    mixer.blend(CommentModel, post=hidden)
+    assert _n_queries(unlogged_client, '/') == 0, (
+        'Убедитесь, что комментарий не сбрасывает кеш ленты, '
+        'на которой нет его публикации.'
+    )
+
+    mixer.blend(CommentModel, post=shown)
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get('/')
+    assert not [
+        query for query in ctx.captured_queries
+        if 'ORDER BY "blog_post"."pub_date" DESC' in query['sql']
+    ], 'Убедитесь, что комментарий не сбрасывает кеш выборок ленты.'
+    assert 'Комментарии (1)' in response.content.decode('utf-8'), (
+        'Убедитесь, что счётчик комментариев в ленте актуален.'
+    )
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query['sql'] for query in ctx.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.parametrize('url_template', [
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+])
+def test_count_is_cached_and_plain(
+        settings, user_client, user, published_category,
+        many_posts_with_published_locations, url_template):
+    # ключ кеша включает корзину времени: оба запроса должны попасть в одну.
+    settings.BLOG_FEED_CACHE_BUCKET = 3600
+    url = url_template.format(category=published_category, user=user)
+    first = _count_queries(user_client, url)
+    assert len(first) == 1
+    assert 'JOIN' not in first[0] and 'GROUP BY' not in first[0], (
+        'Убедитесь, что пагинатор считает публикации без лишних '
+        f'соединений и группировок: {first[0]}'
+    )
+    assert not _count_queries(user_client, f'{url}?page=2'), (
+        'Убедитесь, что количество публикаций для пагинации кешируется.'
+    )
+
+
+def test_estimated_count_is_capped(
+        settings, user_client, many_posts_with_published_locations):
+    settings.BLOG_PAGINATOR_COUNT_MODE = 'estimated'
+    settings.BLOG_PAGINATOR_COUNT_LIMIT = N_PER_PAGE + 1
+    page_obj = user_client.get('/').context['page_obj']
+    assert page_obj.paginator.count == N_PER_PAGE + 1
+    assert page_obj.paginator.num_pages == 2
@@ -0,0 +1,88 @@
+import pstats
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import Client
+
+from monitoring.profiling import make_token
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def staff(mixer, django_user_model):
+    return mixer.blend(django_user_model, is_staff=True, is_active=True)
+
+
+@pytest.fixture
+def staff_client(staff):
+    client = Client()
+    client.force_login(staff)
+    return client
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.MONITORING_PROFILING = True
+    settings.MONITORING_PROFILE_DIR = tmp_path
+    return tmp_path
+
+
+def test_profile_request(staff, staff_client, profiling):
+    response = staff_client.get(
+        f'/profile/{staff.username}/',
+        HTTP_X_PROFILE_TOKEN=make_token(staff),
+    )
+    assert response.status_code == 200
+    name = response['X-Profile']
+    assert 'blog-profile' in name
+    stats = pstats.Stats(str(profiling / f'{name}.prof'))
+    assert any(
+        function == 'profile' for _, _, function in stats.stats
+    ), 'Убедитесь, что представление выполняется под cProfile.'
+    allocations = (profiling / f'{name}.alloc.txt').read_text()
+    assert allocations.startswith('Пик памяти')
+    collapsed = (profiling / f'{name}.collapsed').read_text()
+    assert all(
+        re.fullmatch(r'\S.* \d+', line) for line in collapsed.splitlines()
+    ), 'Убедитесь, что стеки записаны в формате collapsed stacks.'
+
+
+def test_token_is_checked(
+        mixer, staff, staff_client, user, user_client, profiling):
+    url = f'/profile/{staff.username}/'
+    assert 'X-Profile' not in staff_client.get(
+        url, {'_profile': 'подделка'})
+    # токен выдан другому пользователю.
+    other_staff = mixer.blend(type(staff), is_staff=True)
+    assert 'X-Profile' not in staff_client.get(
+        url, {'_profile': make_token(other_staff)})
+    # не сотрудник.
+    assert 'X-Profile' not in user_client.get(
+        url, {'_profile': make_token(user)})
+    assert 'X-Profile' in staff_client.get(
+        url, {'_profile': make_token(staff)})
+    assert len(list(profiling.glob('*.prof'))) == 1
+
+
+def test_profiling_is_off_by_default(staff, staff_client, tmp_path, settings):
+    settings.MONITORING_PROFILE_DIR = tmp_path
+    response = staff_client.get(
+        f'/profile/{staff.username}/',
+        HTTP_X_PROFILE_TOKEN=make_token(staff),
+    )
+    assert 'X-Profile' not in response
+    assert not list(tmp_path.iterdir())
+
+
+def test_profile_token_command(staff, user, settings):
+    settings.MONITORING_PROFILING = True
+    out = StringIO()
+    call_command('profile_token', staff.username, stdout=out)
+    assert '_profile=' in out.getvalue()
+    with pytest.raises(CommandError, match='сотрудники'):
+        call_command('profile_token', user.username)
@@ -0,0 +1,117 @@
+import subprocess
+import sys
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils.module_loading import import_string
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.scheduler import PublicationScheduler, visible_at
+from blog.signals import post_became_visible
+from blog.tasks import prerender_pages
+from blogicum import settings as project_settings
+from jobs.models import Job
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def clock():
+    class Clock:
+        now = timezone.now()
+
+        def __call__(self):
+            return self.now
+
+    return Clock()
+
+
+def test_visible_at_rounds_up_to_feed_bucket(settings):
+    settings.BLOG_FEED_CACHE_BUCKET = 30
+    moment = timezone.now().replace(second=10, microsecond=0)
+    assert visible_at(moment) == moment.replace(second=30)
+
+
+def test_scheduler_announces_post_when_due(
+        mixer, settings, clock, published_category):
+    settings.BLOG_SCHEDULER_WINDOW = 600
+    settings.BLOG_FEED_CACHE_BUCKET = 30
+    due = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        pub_date=clock.now + timedelta(minutes=2))
+    mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        pub_date=clock.now + timedelta(hours=2))
+
+    announced = []
+
+    def receiver(sender, post, **kwargs):
+        announced.append(post)
+
+    post_became_visible.connect(receiver)
+    try:
+        scheduler = PublicationScheduler(clock=clock)
+        scheduler.run_once()
+        assert [pk for _, pk in scheduler.heap] == [due.pk], (
+            'Убедитесь, что планировщик держит в куче только посты '
+            'из текущего окна.'
+        )
+        assert not announced
+
+        clock.now = visible_at(due.pub_date)
+        scheduler.run_once()
+    finally:
+        post_became_visible.disconnect(receiver)
+    assert announced == [due], (
+        'Убедитесь, что при наступлении даты публикации отправляется '
+        'сигнал post_became_visible.'
+    )
+    assert Job.objects.filter(task='blog.tasks.prerender_pages').exists(), (
+        'Убедитесь, что страницы нового поста ставятся на прогрев.')
+
+
+def test_scheduler_skips_rescheduled_post(mixer, clock, published_category):
+    post = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        pub_date=clock.now + timedelta(seconds=40))
+    scheduler = PublicationScheduler(clock=clock)
+    scheduler.run_once()
+    post.pub_date = clock.now + timedelta(days=1)
+    post.save()
+    clock.now += timedelta(minutes=1)
+    assert scheduler.run_due(clock.now) == []
+
+
+def test_prerender_fills_anonymous_page_cache(
+        unlogged_client, post_with_published_location):
+    prerender_pages(['/'])
+    with CaptureQueriesContext(connection) as ctx:
+        unlogged_client.get('/')
+    assert not ctx.captured_queries, (
+        'Убедитесь, что прогрев кладёт страницу в кеш анонимных страниц.')
+
+
+READ_FROM_OTHER_PROCESS = """
+import sys
+from django.utils.module_loading import import_string
+backend, location = sys.argv[1:]
+print(import_string(backend)(location, {}).get('blog:shared'))
+"""
+
+
+def test_project_cache_is_shared_between_processes(tmp_path):
+    # планировщик и воркер сбрасывают и прогревают кеш веб-процессов.
+    backend = project_settings.CACHES['default']['BACKEND']
+    import_string(backend)(str(tmp_path), {}).set('blog:shared', 'видно')
+    result = subprocess.run(
+        [sys.executable, '-c', READ_FROM_OTHER_PROCESS, backend,
+         str(tmp_path)],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == 'видно', (
+        'Убедитесь, что кеш проекта общий для процессов (CACHES).'
+    )
@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.search import search_posts
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='FTS5 есть только в SQLite'),
+]
+
+
+def _search(client, query, after=None):
+    params = {'q': query}
+    if after:
+        params['after'] = after
+    response = client.get('/search/', params)
+    assert response.status_code == 200
+    return response.context
+
+
+def test_search_ranks_and_highlights(
+        mixer, user_client, published_category):
+    in_text = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        title='Прогулка', text='Встретили <b>енота</b> у реки')
+    in_title = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        title='Енот на даче', text='Ничего особенного')
+    mixer.blend(
+        'blog.Post', is_published=False, category=published_category,
+        title='Скрытый енот', text='Не для поиска')
+
+    results = _search(user_client, 'енот')['results']
+    assert [post.pk for post in results] == [in_title.pk, in_text.pk], (
+        'Убедитесь, что поиск находит только опубликованные посты и '
+        'ставит выше совпадения в заголовке.'
+    )
+    assert '<mark>' in results[0].search_title
+    assert '&lt;b&gt;' in results[1].search_snippet, (
+        'Убедитесь, что HTML из текста поста экранируется в сниппете.'
+    )
+
+
+def test_search_follows_edits_and_category_names(
+        mixer, user_client, published_category, run_jobs):
+    post = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        title='Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert not _search(user_client, 'Старый')['results']
+    assert _search(user_client, 'Новый')['results'] == [post]
+
+    published_category.title = 'Путешествия'
+    published_category.save()
+    run_jobs()
+    assert _search(user_client, 'путешествия')['results'] == [post]
+
+    post.delete()
+    assert not _search(user_client, 'Новый')['results']
+
+
+def test_search_cursor_pages(mixer, user_client, published_category):
+    posts = mixer.cycle(15).blend(
+        'blog.Post', is_published=True, category=published_category,
+        title='Одинаковый заголовок')
+    context = _search(user_client, 'одинаковый')
+    first = context['results']
+    second = _search(
+        user_client, 'одинаковый', context['next_cursor'])['results']
+    assert len(first) == 10
+    assert {post.pk for post in first + second} == {
+        post.pk for post in posts}
+
+
+def test_rebuild_search_index(mixer, user_client, published_category):
+    post = mixer.blend(
+        'blog.Post', is_published=True, category=published_category,
+        title='Переиндексация')
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert not _search(user_client, 'Переиндексация')['results']
+
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert _search(user_client, 'Переиндексация')['results'] == [post]
+
+
+def test_highlight_is_computed_only_for_page_rows(
+        mixer, published_category):
+    mixer.cycle(5).blend(
+        'blog.Post', is_published=True, category=published_category,
+        title='Енот', text='Про енота')
+    with CaptureQueriesContext(connection) as ctx:
+        results, next_cursor = search_posts('енот', limit=2)
+    assert len(results) == 2 and next_cursor
+    ranking, highlighting = [
+        query['sql'] for query in ctx.captured_queries
+        if 'MATCH' in query['sql']
+    ]
+    assert 'highlight(' not in ranking and 'snippet(' not in ranking, (
+        'Убедитесь, что подсветка не считается для всех совпадений.'
+    )
+    assert 'rowid IN' in highlighting
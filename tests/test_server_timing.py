@@ -0,0 +1,46 @@
+import logging
+import re
+
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _timings(response):
+    return {
+        name: float(duration)
+        for name, duration in re.findall(
+            r'(\w+);dur=([\d.]+)', response['Server-Timing'])
+    }
+
+
+def test_server_timing_header(client, post_with_published_location, caplog):
+    with caplog.at_level(logging.INFO, logger='monitoring.requests'):
+        response = client.get(
+            f'/posts/{post_with_published_location.pk}/')
+    assert response.status_code == 200
+    assert 'Server-Timing' in response, (
+        'Убедитесь, что ответ содержит заголовок Server-Timing.'
+    )
+    timings = _timings(response)
+    assert set(timings) == {'db', 'template', 'view'}
+    assert timings['template'] > 0
+    assert timings['view'] >= timings['db']
+    record, = [
+        record for record in caplog.records
+        if record.name == 'monitoring.requests'
+    ]
+    assert record.view_name == 'blog:post_detail'
+    assert record.status == 200
+    assert record.queries > 0
+    assert f'desc="{record.queries} queries"' in response['Server-Timing']
+
+
+def test_sampling_per_view(client, settings):
+    settings.MONITORING_SAMPLE_RATES = {'blog:index': 0}
+    assert 'Server-Timing' not in client.get('/')
+    settings.MONITORING_SAMPLE_RATE = 0
+    settings.MONITORING_SAMPLE_RATES = {'blog:index': 1}
+    assert 'Server-Timing' in client.get('/')
@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pytest
+
+from monitoring.logs import JsonLinesFileHandler
+from monitoring.slowlog import logger
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def slow_log(tmp_path, monkeypatch):
+    path = tmp_path / 'logs' / 'slow.jsonl'
+    handler = JsonLinesFileHandler(path, maxBytes=1024 * 1024)
+    monkeypatch.setattr(logger, 'handlers', [handler])
+
+    def read():
+        handler.flush()
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield read
+    handler.close()
+
+
+def test_slow_queries_are_logged_with_plan(
+        client, settings, slow_log, many_posts_with_published_locations):
+    settings.MONITORING_SLOW_QUERY_MS = 0
+    assert client.get('/').status_code == 200
+    entries = slow_log()
+    assert entries, 'Убедитесь, что медленные запросы попадают в журнал.'
+    assert {entry['view_name'] for entry in entries} == {'blog:index'}
+    feed = [entry for entry in entries if '"blog_post"' in entry['sql']]
+    assert feed
+    assert all('%s' not in entry['sql'] for entry in entries), (
+        'Убедитесь, что в журнал пишется нормализованный SQL.'
+    )
+    assert any(entry['plan'] for entry in feed), (
+        'Убедитесь, что к запросу прикладывается EXPLAIN QUERY PLAN.'
+    )
+    assert all(entry['duration_ms'] >= 0 for entry in entries)
+
+
+def test_threshold_and_view_filter(client, settings, slow_log):
+    settings.MONITORING_SLOW_QUERY_MS = 10 ** 6
+    client.get('/')
+    assert slow_log() == []
+    settings.MONITORING_SLOW_QUERY_MS = 0
+    settings.MONITORING_SLOW_QUERY_VIEWS = ('pages:',)
+    client.get('/')
+    assert slow_log() == []
+
+
+def test_log_rotates(tmp_path):
+    handler = JsonLinesFileHandler(
+        tmp_path / 'rotating.jsonl', maxBytes=200, backupCount=2)
+    log = logging.getLogger('monitoring.tests.rotation')
+    log.addHandler(handler)
+    try:
+        for number in range(20):
+            log.warning({'number': number, 'padding': 'x' * 50})
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+    assert (tmp_path / 'rotating.jsonl.1').exists()
+    assert not (tmp_path / 'rotating.jsonl.3').exists()